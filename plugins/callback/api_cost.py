@@ -0,0 +1,195 @@
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+---
+author: Ansible Security Automation Team
+callback: api_cost
+type: aggregate
+short_description: Summarize the Symantec Endpoint Protection Manager API cost of tasks
+description:
+  - Add up the API calls, pages, errors, time and bytes reported by the
+    modules of the collection in the C(flow_control.requests) key of their
+    results, per task and per play. The key is documented in the RETURN
+    attribute of the symantec.epm.flow_control documentation fragment.
+  - At the end of the playbook, print the tasks ranked by their cost and
+    the totals of each play, and optionally write them to a JSON file.
+version_added: "2.9"
+requirements:
+  - enable in configuration, e.g. C(callbacks_enabled = symantec.epm.api_cost)
+options:
+  sort_by:
+    description:
+      - The counter the tasks are ranked by.
+    type: str
+    choices:
+      - calls
+      - pages
+      - errors
+      - seconds
+      - bytes_received
+    default: seconds
+    env:
+      - name: SYMANTEC_EPM_API_COST_SORT_BY
+    ini:
+      - section: callback_api_cost
+        key: sort_by
+  output_limit:
+    description:
+      - Number of tasks to print, all of them when 0.
+    type: int
+    default: 20
+    env:
+      - name: SYMANTEC_EPM_API_COST_OUTPUT_LIMIT
+    ini:
+      - section: callback_api_cost
+        key: output_limit
+  json_path:
+    description:
+      - Also write the cost of every task and the totals of every play to
+        this file, as JSON.
+    type: path
+    env:
+      - name: SYMANTEC_EPM_API_COST_JSON_PATH
+    ini:
+      - section: callback_api_cost
+        key: json_path
+"""
+
+import json
+
+from collections import OrderedDict
+
+from ansible.plugins.callback import CallbackBase
+
+COUNTERS = ["calls", "pages", "errors", "seconds", "bytes_sent", "bytes_received"]
+
+
+def _empty_cost():
+    return OrderedDict((counter, 0) for counter in COUNTERS)
+
+
+def _add_cost(total, cost):
+    for counter in COUNTERS:
+        value = cost.get(counter)
+        if isinstance(value, (int, float)):
+            total[counter] += value
+
+
+class CallbackModule(CallbackBase):
+    """
+    Aggregate the API statistics of the Symantec EPM modules per task and
+    per play, like profile_tasks does for task durations.
+    """
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "symantec.epm.api_cost"
+    CALLBACK_NEEDS_WHITELIST = True
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._play = None
+        self._tasks = OrderedDict()
+
+    def _start_task(self, task):
+        if task._uuid not in self._tasks:
+            self._tasks[task._uuid] = dict(
+                name=task.get_name().strip(),
+                play=self._play or "",
+                hosts=[],
+                cost=_empty_cost(),
+            )
+
+    def _record(self, result):
+        results = result._result.get("results")
+        if not isinstance(results, list):
+            # Not a loop
+            results = [result._result]
+        costs = [
+            item["flow_control"]["requests"]
+            for item in results
+            if isinstance(item, dict)
+            and isinstance(item.get("flow_control"), dict)
+            and isinstance(item["flow_control"].get("requests"), dict)
+        ]
+        if not costs:
+            return
+        self._start_task(result._task)
+        task = self._tasks[result._task._uuid]
+        for cost in costs:
+            _add_cost(task["cost"], cost)
+        host = result._host.get_name()
+        if host not in task["hosts"]:
+            task["hosts"].append(host)
+
+    def v2_playbook_on_play_start(self, play):
+        self._play = play.get_name().strip()
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._start_task(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._start_task(task)
+
+    def v2_runner_on_ok(self, result):
+        self._record(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result)
+
+    def v2_playbook_on_stats(self, stats):
+        tasks = [task for task in self._tasks.values() if task["cost"]["calls"]]
+        if not tasks:
+            return
+        sort_by = self.get_option("sort_by")
+        limit = self.get_option("output_limit")
+        ranked = sorted(tasks, key=lambda task: task["cost"][sort_by], reverse=True)
+
+        plays = OrderedDict()
+        for task in tasks:
+            _add_cost(plays.setdefault(task["play"], _empty_cost()), task["cost"])
+
+        self._display.banner("SYMANTEC EPM API COST")
+        line = "{0:<48} {1:>7} {2:>7} {3:>7} {4:>10} {5:>12}"
+        self._display.display(
+            line.format("TASK", "CALLS", "PAGES", "ERRORS", "SECONDS", "KB RECEIVED")
+        )
+        for task in ranked[:limit] if limit else ranked:
+            self._display.display(self._format(line, task["name"], task["cost"]))
+        self._display.display("")
+        self._display.display(
+            line.format("PLAY", "CALLS", "PAGES", "ERRORS", "SECONDS", "KB RECEIVED")
+        )
+        for play, cost in plays.items():
+            self._display.display(self._format(line, play, cost))
+
+        json_path = self.get_option("json_path")
+        if json_path:
+            with open(json_path, "w") as json_file:
+                json.dump(
+                    dict(
+                        tasks=ranked,
+                        plays=[dict(play=play, cost=cost) for play, cost in plays.items()],
+                    ),
+                    json_file,
+                    indent=2,
+                )
+
+    @staticmethod
+    def _format(line, name, cost):
+        if len(name) > 48:
+            name = name[:45] + "..."
+        return line.format(
+            name,
+            cost["calls"],
+            cost["pages"],
+            cost["errors"],
+            "%.2f" % cost["seconds"],
+            "%.1f" % (cost["bytes_received"] / 1024.0),
+        )
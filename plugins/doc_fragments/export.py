@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # Options of the export modules, see EXPORT_ARGSPEC in module_utils/export.py
+    DOCUMENTATION = r"""
+options:
+  path:
+    description:
+     - Path of the local file to write, its directory must exist.
+     - The file is written to a temporary file in the same directory as rows
+       arrive and then moved into place, it is left untouched if its content
+       would not change.
+    required: true
+    type: path
+  format:
+    description:
+     - C(ndjson) writes one JSON document per line, C(csv) writes a header row
+       and one row per record with nested values encoded as JSON.
+    required: false
+    type: str
+    choices:
+     - ndjson
+     - csv
+    default: ndjson
+  compress:
+    description:
+     - Gzip compress the file.
+    required: false
+    type: bool
+    default: false
+  fields:
+    description:
+     - Only export these fields.
+     - For C(csv) this sets the columns, which otherwise are all the fields
+       found in the records, in the order they first appear. Without it the
+       rows are spooled to a temporary file until the header is known.
+    required: false
+    type: list
+    elements: str
+"""
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # The flow_control result returned by every module
+    DOCUMENTATION = r"""
+options: {}
+notes:
+  - The result has a C(flow_control) key with the state of the adaptive
+    concurrency limit in C(flow_control.concurrency), of the circuit breaker
+    in C(flow_control.breaker) and the statistics of the API calls of the
+    task in C(flow_control.requests), see the RETURN attribute of the
+    symantec.epm.flow_control documentation fragment.
+  - The persistent connection process (ansible-connection) handles one
+    request of a task at a time. Options setting how many calls a module
+    makes at the same time bound the threads of the module, which overlap
+    the work done around the requests, but the HTTP requests themselves are
+    never sent in parallel.
+"""
+
+    # Return value documentation of flow_control, ansible-doc does not merge
+    # fragments into RETURN so the modules list the key and refer to it
+    RETURN = r"""
+flow_control:
+    description: State of the adaptive concurrency limit and of the circuit
+                 breaker shared by all API calls of the task
+    returned: always
+    type: complex
+    contains:
+        concurrency:
+            description: Current concurrency limit and number of calls in flight
+            type: dict
+        breaker:
+            description: Circuit breaker state (closed, open or half_open),
+                         consecutive failures and number of times it opened
+            type: dict
+        requests:
+            description: Statistics of the API calls of the task, added up
+                         per task and per play by the symantec.epm.api_cost
+                         callback
+            type: complex
+            contains:
+                calls:
+                    description: Number of API calls
+                    type: int
+                pages:
+                    description: Number of calls returning a page of records
+                    type: int
+                errors:
+                    description: Number of failed calls, including error
+                                 responses
+                    type: int
+                seconds:
+                    description: Total time of the calls
+                    type: float
+                bytes_sent:
+                    description: Size of the request bodies
+                    type: int
+                bytes_received:
+                    description: Size of the responses, estimated from their
+                                 JSON encoding and for pages from the size of
+                                 their first record
+                    type: int
+"""
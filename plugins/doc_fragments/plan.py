@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # The plan result of the modules estimating their cost
+    DOCUMENTATION = r"""
+options: {}
+notes:
+  - The C(plan) result is an estimate of the cost of the run, made with a
+    single probe request. Its C(seconds) are a lower bound, the latency of
+    the probe times the number of requests, while pages of many records take
+    longer than the probe. See the RETURN attribute of the symantec.epm.plan
+    documentation fragment.
+"""
+
+    # Return value documentation of plan, ansible-doc does not merge
+    # fragments into RETURN so the modules list the key and refer to it
+    RETURN = r"""
+plan:
+    description: Estimated cost of the run
+    type: complex
+    contains:
+        requests:
+            description: Number of API requests
+            type: int
+        records:
+            description: Number of records fetched
+            type: int
+        bytes:
+            description: Approximate size of the records in JSON
+            type: int
+        command_queue_entries:
+            description: Number of command queue entries created
+            type: int
+        seconds:
+            description: Lower bound of the time of the requests, the latency
+                         of a probe request times the number of requests,
+                         which are sent one at a time
+            type: float
+"""
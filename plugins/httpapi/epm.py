@@ -14,22 +14,287 @@ description:
   - This HttpApi plugin provides methods to connect to Symantec Endpoint
     Protection over a HTTP(S)-based api.
 version_added: "2.9"
+notes:
+  - If the C(orjson) Python library is installed on the controller it is used
+    to decode API responses, which is faster and uses less memory on large
+    result pages.
+options:
+  profile_dir:
+    type: path
+    description:
+      - Profile the requests sent by the plugin with cProfile and tracemalloc
+        and write the profiles to this directory when the session ends.
+      - Modules of the collection are profiled to the same directory when the
+        C(SYMANTEC_EPM_PROFILE_DIR) environment variable is set.
+    env:
+      - name: SYMANTEC_EPM_PROFILE_DIR
+    vars:
+      - name: ansible_httpapi_epm_profile_dir
+  cassette:
+    type: path
+    description:
+      - Cassette file of recorded API interactions, see I(cassette_mode).
+    env:
+      - name: SYMANTEC_EPM_CASSETTE
+    vars:
+      - name: ansible_httpapi_epm_cassette
+  cassette_mode:
+    type: str
+    description:
+      - C(record) writes every request sent and its response with its latency
+        to I(cassette), a gzip compressed file of newline delimited JSON.
+        Headers are not recorded and the values of passwords, tokens and
+        other secrets are redacted.
+      - Interactions are appended to I(cassette) under a lock, the
+        connections of all hosts can record to the same file. Remove it to
+        start a new recording.
+      - C(replay) serves the responses recorded in I(cassette) without
+        connecting to the Symantec Endpoint Protection Manager, requests not
+        recorded fail.
+    choices:
+      - "off"
+      - record
+      - replay
+    default: "off"
+    env:
+      - name: SYMANTEC_EPM_CASSETTE_MODE
+    vars:
+      - name: ansible_httpapi_epm_cassette_mode
+  cassette_replay_latency:
+    type: bool
+    description:
+      - Wait for the recorded latency of every replayed request, otherwise
+        responses are replayed as fast as possible.
+    default: true
+    env:
+      - name: SYMANTEC_EPM_CASSETTE_REPLAY_LATENCY
+    vars:
+      - name: ansible_httpapi_epm_cassette_replay_latency
+  keepalive:
+    type: bool
+    description:
+      - Send the requests of a session over a pool of persistent HTTP(S)
+        connections, resuming the TLS session when a new connection is
+        needed, instead of opening a new connection per request.
+      - The pool connects directly to the host and validates its certificate
+        with the default CA certificates of the system. The requests go
+        through the connection as without this option when it is set up
+        with a C(ca_path), a C(client_cert) or a C(client_key), or when a
+        proxy of the environment applies to the host and C(use_proxy) is
+        not disabled.
+      - A request failing on a connection the server closed while idle is
+        sent again on a new connection, unless it is a POST or PATCH request
+        the server may already have received.
+      - Handshake and connection reuse counters are returned by
+        C(keepalive_stats) and logged at the end of the session with -vvv.
+    default: false
+    env:
+      - name: SYMANTEC_EPM_KEEPALIVE
+    vars:
+      - name: ansible_httpapi_epm_keepalive
+  request_cache_ttl:
+    type: float
+    description:
+      - Seconds successful GET responses are shared between the connections
+        of the controller, C(0) disables sharing.
+      - Identical GET requests sent at the same time, e.g. by all the forks of
+        a play running C(groups_info) against the same manager, are sent only
+        once and the others wait for its response. Requests following within
+        this many seconds get the same response.
+      - Responses are only shared between connections to the same host as
+        the same user.
+      - Responses of the command queue, such as the command status polled
+        by C(symantec.epm.command_status), are never shared. Nor are the
+        requests of C(symantec.epm.move_endpoints) and of
+        C(symantec.epm.quarantine_endpoints) with C(check_state), which read
+        the state they change, or any request with a C(no-cache)
+        C(Cache-Control) header.
+    default: 0
+    env:
+      - name: SYMANTEC_EPM_REQUEST_CACHE_TTL
+    vars:
+      - name: ansible_httpapi_epm_request_cache_ttl
+  request_cache_dir:
+    type: path
+    description:
+      - Directory of the shared GET responses, only accessible by its owner.
+      - Defaults to a per-user directory in the system temporary directory.
+      - The connection fails if the directory is a symlink, is owned by
+        another user or is accessible by other users.
+    env:
+      - name: SYMANTEC_EPM_REQUEST_CACHE_DIR
+    vars:
+      - name: ansible_httpapi_epm_request_cache_dir
+  metrics_textfile:
+    type: path
+    description:
+      - Count the requests sent by the plugin, their latency, the bytes sent
+        and received, rate limited requests and retries, by endpoint, and add
+        them to this file in the Prometheus text format when the session
+        ends.
+      - The file is replaced atomically and the counters of all the sessions
+        writing to it accumulate, so it can be read by the node_exporter
+        textfile collector. Its name must end with C(.prom).
+      - Responses served from I(cassette) or shared with I(request_cache_ttl)
+        are not counted.
+    env:
+      - name: SYMANTEC_EPM_METRICS_TEXTFILE
+    vars:
+      - name: ansible_httpapi_epm_metrics_textfile
 """
 
 import json
+import time
+
+from io import BytesIO
 
 from ansible.module_utils.basic import to_text, to_bytes
-from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible.module_utils.six import binary_type, text_type
+from ansible.module_utils.six.moves.urllib.parse import urlencode, urlparse
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
 from ansible.errors import AnsibleConnectionFailure, AnsibleAuthenticationFailure
 from ansible.module_utils.six.moves.urllib.error import HTTPError
 from ansible.plugins.httpapi import HttpApiBase
 from ansible.module_utils.connection import ConnectionError
+from ansible_collections.symantec.epm.plugins.module_utils.cassette import Cassette
+from ansible_collections.symantec.epm.plugins.module_utils.keepalive import (
+    KeepAlivePool,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.metrics import ApiMetrics
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import Profiler
+from ansible_collections.symantec.epm.plugins.module_utils.request_cache import (
+    RequestCacheError,
+    SharedRequestCache,
+    default_cache_dir,
+)
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 BASE_HEADERS = {"Content-Type": "application/json"}
 
+# Responses changing while commands run, never shared by the request cache
+UNCACHED_PATHS = ("/command-queue/",)
+
 
 class HttpApi(HttpApiBase):
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._profiler = None
+        self._cassette = None
+        self._pool = None
+        self._keepalive = None
+        self._request_cache = None
+        self._metrics = None
+        self._received_bytes = 0
+
+    def _get_option(self, option):
+        try:
+            return self.get_option(option)
+        except KeyError:
+            # Options not set by the connection
+            return None
+
+    def _get_connection_option(self, option):
+        try:
+            return self.connection.get_option(option)
+        except KeyError:
+            # Options of newer versions of the connection
+            return None
+
+    @property
+    def keepalive(self):
+        """Whether the requests are sent over the keepalive pool, which does
+        not support the proxy, CA path and client certificate settings of the
+        connection."""
+        if self._keepalive is None:
+            host = self._get_connection_option("host")
+            scheme = "https" if self._get_connection_option("use_ssl") is not False else "http"
+            proxied = (
+                self._get_connection_option("use_proxy") is not False
+                and scheme in getproxies()
+                and not proxy_bypass(host or "")
+            )
+            unsupported = [
+                option
+                for option in ("ca_path", "client_cert", "client_key")
+                if self._get_connection_option(option)
+            ] + (["proxy"] if proxied else [])
+            self._keepalive = bool(self._get_option("keepalive"))
+            if self._keepalive and unsupported:
+                self._keepalive = False
+                self.connection.queue_message(
+                    "vvv",
+                    "keepalive disabled, not supported with %s" % ", ".join(unsupported),
+                )
+        return self._keepalive
+
+    @property
+    def profiler(self):
+        """Profiler of the session, None unless profile_dir is set."""
+        if self._profiler is None:
+            profile_dir = self._get_option("profile_dir")
+            self._profiler = Profiler(profile_dir, "httpapi") if profile_dir else False
+        return self._profiler or None
+
+    @property
+    def cassette(self):
+        """Cassette of the session, None unless cassette_mode is set."""
+        if self._cassette is None:
+            mode = self._get_option("cassette_mode")
+            if mode in ("record", "replay"):
+                path = self._get_option("cassette")
+                if not path:
+                    raise AnsibleConnectionFailure(
+                        "cassette is required with cassette_mode %s" % mode
+                    )
+                replay_latency = self._get_option("cassette_replay_latency")
+                self._cassette = Cassette(
+                    path, mode, replay_latency=replay_latency is not False
+                )
+            else:
+                self._cassette = False
+        return self._cassette or None
+
+    @property
+    def request_cache(self):
+        """Shared request cache, None unless request_cache_ttl is set."""
+        if self._request_cache is None:
+            ttl = self._get_option("request_cache_ttl")
+            try:
+                self._request_cache = (
+                    SharedRequestCache(
+                        self._get_option("request_cache_dir") or default_cache_dir(), ttl
+                    )
+                    if ttl
+                    else False
+                )
+            except RequestCacheError as e:
+                raise AnsibleConnectionFailure("Unable to use the request cache: %s" % e)
+        return self._request_cache or None
+
+    @property
+    def metrics(self):
+        """API metrics of the session, None unless metrics_textfile is set."""
+        if self._metrics is None:
+            self._metrics = (
+                ApiMetrics(self.connection.get_option("host"))
+                if self._get_option("metrics_textfile")
+                else False
+            )
+        return self._metrics or None
+
     def send_request(self, request_method, url, params=None, data=None, headers=None):
+        if self.profiler is None:
+            return self._send_request(request_method, url, params, data, headers)
+        with self.profiler:
+            return self._send_request(request_method, url, params, data, headers)
+
+    def _send_request(self, request_method, url, params=None, data=None, headers=None):
         headers = headers if headers else BASE_HEADERS
 
         if params:
@@ -39,17 +304,123 @@ class HttpApi(HttpApiBase):
                     params_with_val[param] = params[param]
             url = "{0}?{1}".format(url, urlencode(params_with_val))
 
+        cassette = self.cassette
+        if cassette is not None and cassette.replaying:
+            recorded = cassette.replay(request_method, url, data)
+            if recorded is None:
+                raise ConnectionError(
+                    "No response recorded for %s %s" % (request_method, url)
+                )
+            return recorded
+
+        if self._shared(request_method, url, headers):
+            key = SharedRequestCache.make_key(
+                self.connection.get_option("host"),
+                self.connection.get_option("port"),
+                self.connection.get_option("remote_user"),
+                url,
+            )
+            return self.request_cache.fetch(
+                key, lambda: self._send_recorded(request_method, url, data, headers)
+            )
+        return self._send_recorded(request_method, url, data, headers)
+
+    def _shared(self, request_method, url, headers):
+        """Whether the response of a request may be shared by the request cache."""
+        if request_method != "GET" or self.request_cache is None:
+            return False
+        if any(path in url for path in UNCACHED_PATHS):
+            return False
+        cache_control = dict((k.lower(), v) for k, v in headers.items()).get(
+            "cache-control", ""
+        )
+        return "no-cache" not in cache_control.lower()
+
+    def _send_recorded(self, request_method, url, data, headers):
+        start = time.time()
+        code, response_data = self._send(request_method, url, data, headers)
+        latency = time.time() - start
+        if self.cassette is not None:
+            self.cassette.record(request_method, url, data, code, response_data, latency)
+        if self.metrics is not None:
+            self.metrics.observe(
+                request_method,
+                url,
+                code,
+                latency,
+                len(data) if data else 0,
+                self._received_bytes,
+            )
+        return code, response_data
+
+    def _send(self, request_method, url, data, headers):
+        if self.keepalive:
+            return self._send_keepalive(request_method, url, data, headers)
+
         try:
             self._display_request(request_method)
             response, response_data = self.connection.send(
                 url, data, method=request_method, headers=headers
             )
-            value = self._get_response_value(response_data)
-
-            return response.getcode(), self._response_to_json(value)
+            return response.getcode(), self._response_to_json(response_data)
         except HTTPError as e:
-            error = json.loads(e.read())
-            return e.code, error
+            error_data = e.read()
+            self._received_bytes = len(error_data)
+            return e.code, json.loads(error_data)
+
+    def _send_keepalive(self, request_method, url, data, headers, retried=False):
+        connection = self.connection
+        if not connection.connected:
+            # Sets the URL and logs in
+            connection._connect()
+        if self._pool is None:
+            server = urlparse(connection._url)
+            self._pool = KeepAlivePool(
+                server.hostname,
+                server.port,
+                use_ssl=server.scheme == "https",
+                validate_certs=connection.get_option("validate_certs"),
+                timeout=connection.get_option("persistent_command_timeout"),
+            )
+
+        request_headers = dict(headers)
+        request_headers.update(connection._auth or {})
+        self._display_request(request_method)
+        response, response_data = self._pool.request(
+            request_method, url, body=data, headers=request_headers
+        )
+
+        if response.status >= 400:
+            error = HTTPError(
+                connection._url + url,
+                response.status,
+                response.reason,
+                response.msg,
+                BytesIO(response_data),
+            )
+            # Log in again on an expired token, like connection.send
+            if not retried and self.handle_httperror(error) is True:
+                return self._send_keepalive(
+                    request_method, url, data, headers, retried=True
+                )
+            return response.status, self._response_to_json(response_data)
+
+        connection._auth = self.update_auth(response, response_data) or connection._auth
+        return response.status, self._response_to_json(response_data)
+
+    def handle_httperror(self, exc):
+        result = super(HttpApi, self).handle_httperror(exc)
+        if result is True and self.metrics is not None:
+            # Logged in again, connection.send and _send_keepalive send the request again
+            self.metrics.retry("reauthenticate")
+        return result
+
+    def keepalive_stats(self):
+        """Connection counters of the keepalive pool.
+
+        :return: Dict of counters, empty unless keepalive is enabled.
+        """
+        return dict(self._pool.stats) if self._pool is not None else {}
 
     def login(self, username, password):
         login_path = "/sepm/api/v1/identity/authenticate"
@@ -74,7 +445,34 @@ class HttpApi(HttpApiBase):
     def _get_response_value(self, response_data):
         return to_text(response_data.getvalue())
 
-    def _response_to_json(self, response_text):
+    def _response_to_json(self, response_data):
+        """Decode a JSON response body.
+
+        When orjson is installed the body is parsed in place through a
+        memoryview of the response buffer, instead of copying it to bytes and
+        then to text first.
+        """
+        if HAS_ORJSON and hasattr(response_data, "getbuffer"):
+            with response_data.getbuffer() as response_buffer:
+                self._received_bytes = response_buffer.nbytes
+                if not response_buffer.nbytes:
+                    return {}
+                try:
+                    return orjson.loads(response_buffer)
+                except ValueError:
+                    pass
+            raise ConnectionError(
+                "Invalid JSON response: %s" % self._get_response_value(response_data)
+            )
+
+        raw = (
+            response_data
+            if isinstance(response_data, (binary_type, text_type))
+            else response_data.getvalue()
+        )
+        # Bytes received, not the characters of the decoded text
+        self._received_bytes = len(to_bytes(raw))
+        response_text = to_text(raw)
         try:
             return json.loads(response_text) if response_text else {}
         # JSONDecodeError only available on Python 3.5+
@@ -96,3 +494,23 @@ class HttpApi(HttpApiBase):
 
             # Clean up tokens
             self.connection._auth = None
+
+        if self._pool is not None:
+            self.connection.queue_message(
+                "vvv", "keepalive connection stats: %s" % self.keepalive_stats()
+            )
+            if self.metrics is not None:
+                self.metrics.retry("stale_connection", self._pool.stats["retries"])
+            self._pool.close()
+            self._pool = None
+
+        if self._request_cache:
+            self.connection.queue_message(
+                "vvv", "request cache stats: %s" % self._request_cache.stats
+            )
+
+        if self.metrics is not None:
+            self.metrics.write_textfile(self._get_option("metrics_textfile"))
+
+        if self.profiler is not None:
+            self.profiler.dump()
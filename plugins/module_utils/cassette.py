@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Record and replay of Symantec EPM API interactions """
+
+import collections
+import fcntl
+import gzip
+import io
+import json
+import os
+import time
+
+from ansible.module_utils.six import iteritems, string_types
+from ansible.module_utils._text import to_bytes, to_text
+
+CASSETTE_MODES = ["off", "record", "replay"]
+
+# Values of keys containing any of these are never written to a cassette
+SENSITIVE_KEY_PARTS = ("password", "token", "authorization", "secret")
+REDACTED = "********"
+
+
+def sanitize(value):
+    """Copy a decoded JSON value with the values of sensitive keys redacted.
+
+    :param value: Decoded JSON value.
+    :return: Sanitized copy.
+    """
+    if isinstance(value, dict):
+        return dict(
+            (
+                k,
+                REDACTED
+                if isinstance(k, string_types)
+                and any(part in k.lower() for part in SENSITIVE_KEY_PARTS)
+                else sanitize(v),
+            )
+            for k, v in iteritems(value)
+        )
+    if isinstance(value, list):
+        return [sanitize(v) for v in value]
+    return value
+
+
+def _request_body(data):
+    """Decode and sanitize a request body."""
+    if not data:
+        return None
+    try:
+        return sanitize(json.loads(to_text(data)))
+    except ValueError:
+        return to_text(data)
+
+
+def _request_key(method, url, body):
+    return method, url, json.dumps(body, sort_keys=True)
+
+
+class Cassette(object):
+    """
+    Gzip compressed file of newline delimited JSON API interactions: method,
+    URL, request body, status code, response body and latency. Request and
+    response bodies are sanitized, headers are not recorded at all.
+
+    Every interaction is appended under a lock as a complete gzip member, so
+    the connection processes of all the hosts of a play can record to the same
+    cassette, and it is readable up to the last interaction even if a session
+    dies. Recording never truncates the cassette, remove it to start over.
+
+    Interactions are replayed by method, URL and request body. Identical
+    requests get the recorded responses in the recorded order, the last one
+    being repeated once they are used up, e.g. when polling a command status.
+    """
+
+    def __init__(self, path, mode, replay_latency=True):
+        """
+        Class constructor
+
+        :param path: Cassette file path.
+        :param mode: record or replay.
+        :param replay_latency: Wait for the recorded latency before returning
+                               a replayed response, otherwise return at once.
+        """
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._interactions = {}
+        if mode == "record":
+            directory = os.path.dirname(path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+        else:
+            with gzip.open(path, "rb") as cassette_file:
+                for line in cassette_file:
+                    interaction = json.loads(to_text(line))
+                    self._interactions.setdefault(
+                        _request_key(
+                            interaction["method"],
+                            interaction["url"],
+                            interaction["request"],
+                        ),
+                        collections.deque(),
+                    ).append(interaction)
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def record(self, method, url, data, status, response, latency):
+        """Append an interaction.
+
+        :param method: HTTP method.
+        :param url: URL path with query string.
+        :param data: Request body.
+        :param status: Response status code.
+        :param response: Decoded response body.
+        :param latency: Seconds the request took.
+        """
+        interaction = {
+            "method": method,
+            "url": url,
+            "request": _request_body(data),
+            "status": status,
+            "response": sanitize(response),
+            "latency": round(latency, 4),
+        }
+        member = io.BytesIO()
+        with gzip.GzipFile(filename="", mode="wb", fileobj=member, mtime=0) as member_file:
+            member_file.write(to_bytes(json.dumps(interaction, sort_keys=True)) + b"\n")
+        with open(self.path, "ab") as cassette_file:
+            fcntl.flock(cassette_file, fcntl.LOCK_EX)
+            try:
+                cassette_file.write(member.getvalue())
+                cassette_file.flush()
+            finally:
+                fcntl.flock(cassette_file, fcntl.LOCK_UN)
+
+    def replay(self, method, url, data):
+        """Get the recorded response to a request.
+
+        :param method: HTTP method.
+        :param url: URL path with query string.
+        :param data: Request body.
+        :return: Tuple of (status code, decoded response body), None if the
+                 request was not recorded.
+        """
+        interactions = self._interactions.get(
+            _request_key(method, url, _request_body(data))
+        )
+        if not interactions:
+            return None
+        interaction = (
+            interactions.popleft() if len(interactions) > 1 else interactions[0]
+        )
+        if self.replay_latency:
+            time.sleep(interaction["latency"])
+        return interaction["status"], interaction["response"]
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Local journal of commands submitted to the Symantec EPM command queue """
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ansible.module_utils._text import to_bytes
+
+# Command status stateId values of a command that has not finished yet:
+# 0 = Not received, 1 = Received, 2 = In progress.
+# Finished commands are 3 = Completed, 4 = Rejected, 5 = Canceled, 6 = Error.
+IN_FLIGHT_STATE_IDS = ["0", "1", "2"]
+
+DEFAULT_MAX_AGE = 3600
+
+
+def payload_hash(payload):
+    """Hash a command payload.
+
+    :param payload: Any JSON serializable value.
+    :return: Hex digest.
+    """
+    return hashlib.sha256(
+        to_bytes(json.dumps(payload, sort_keys=True))
+    ).hexdigest()
+
+
+def split_ids(ids):
+    """Split a comma delimited list of IDs into a sorted list."""
+    return sorted(set(i.strip() for i in (ids or "").split(",") if i.strip()))
+
+
+class CommandJournal(object):
+    """
+    Journal of the commands submitted by the modules, stored as a JSON file on
+    the controller and indexed by a key derived from the command type, its
+    targets and the hash of its payload.
+    """
+
+    def __init__(self, path, max_age=DEFAULT_MAX_AGE):
+        """
+        Class constructor
+
+        :param path: Path of the journal file.
+        :param max_age: Seconds after which an entry is no longer reused.
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_age = max_age
+        self._lock_file = None
+
+    @staticmethod
+    def make_key(command_type, computer_ids=None, group_ids=None, payload=None):
+        """Build the index key of a command.
+
+        :param command_type: Type of the command, e.g. "scan" or "baseline".
+        :param computer_ids: Comma delimited list of computer ids.
+        :param group_ids: Comma delimited list of group ids.
+        :param payload: The part of the command payload that identifies it.
+        :return: Index key.
+        """
+        return payload_hash(
+            {
+                "type": command_type,
+                "computers": split_ids(computer_ids),
+                "groups": split_ids(group_ids),
+                "payload": payload_hash(payload),
+            }
+        )
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as journal_file:
+                return json.load(journal_file).get("entries", {})
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path), prefix=".symantec_epm_journal"
+        )
+        with os.fdopen(fd, "w") as journal_file:
+            json.dump({"entries": entries}, journal_file)
+        os.rename(tmp_path, self.path)
+
+    def acquire(self):
+        """Lock the journal against the other modules using it. Hold the lock
+        from the lookup of a command until it is recorded, so that identical
+        commands submitted at the same time are only submitted once.
+
+        The lock is released by release, or when the module process exits.
+        """
+        if self._lock_file is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        lock_file = open(self.path + ".lock", "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        self._lock_file = lock_file
+
+    def release(self):
+        """Release the lock taken by acquire."""
+        if self._lock_file is None:
+            return
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        finally:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def lookup(self, key):
+        """Get the entry recorded for a key if it is not older than max_age.
+
+        :param key: Index key built with make_key.
+        :return: Entry dict or None.
+        """
+        entry = self._read().get(key)
+        if entry is None or time.time() - entry["time"] > self.max_age:
+            return None
+        return entry
+
+    def record(self, key, command_type, computer_ids, group_ids, payload, command_ids, sepm_data):
+        """Record a submitted command, expired entries are dropped on the way.
+
+        :param key: Index key built with make_key.
+        :param command_type: Type of the command.
+        :param computer_ids: Comma delimited list of computer ids.
+        :param group_ids: Comma delimited list of group ids.
+        :param payload: The part of the command payload that identifies it.
+        :param command_ids: Command IDs returned by the Endpoint Protection Manager.
+        :param sepm_data: Data returned by the Endpoint Protection Manager.
+        """
+        held = self._lock_file is not None
+        self.acquire()
+        try:
+            now = time.time()
+            entries = dict(
+                (k, v)
+                for k, v in self._read().items()
+                if now - v["time"] <= self.max_age
+            )
+            entries[key] = {
+                "type": command_type,
+                "computers": split_ids(computer_ids),
+                "groups": split_ids(group_ids),
+                "payload_hash": payload_hash(payload),
+                "command_ids": command_ids,
+                "sepm_data": sepm_data,
+                "time": now,
+            }
+            self._write(entries)
+        finally:
+            if not held:
+                self.release()
+
+
+def command_in_flight(sclient, command_id):
+    """Check through the command status whether a command is still running on
+    any of its endpoints.
+
+    :param sclient: Sepclient instance.
+    :param command_id: The command id.
+    :return: True if the command has not finished yet.
+    """
+    dispatched = False
+    for page in sclient.iter_pages(sclient.get_command_status, commandid=command_id):
+        if "content" not in page:
+            return False
+        for detail in page["content"]:
+            dispatched = True
+            if str(detail.get("stateId")) in IN_FLIGHT_STATE_IDS:
+                return True
+    # Queued but not yet dispatched to any endpoint counts as in flight.
+    return not dispatched
+
+
+def find_in_flight(journal, sclient, key):
+    """Find a journal entry for key whose commands are still in flight.
+
+    :param journal: CommandJournal instance.
+    :param sclient: Sepclient instance.
+    :param key: Index key built with CommandJournal.make_key.
+    :return: Journal entry dict or None.
+    """
+    entry = journal.lookup(key)
+    if entry is None:
+        return None
+    if any(command_in_flight(sclient, cid) for cid in entry["command_ids"]):
+        return entry
+    return None
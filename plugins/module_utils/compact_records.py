@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Compact columnar storage for large sets of Symantec EPM records """
+
+from ansible.module_utils.six import iteritems, string_types
+
+
+class _Missing(object):
+    """Marks a key absent from a record."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class _FrozenDict(tuple):
+    """Hashable stand-in of a nested dict, a tuple of (key, value) pairs
+    after the _DICT_TAG marker."""
+
+    __slots__ = ()
+
+
+class _FrozenList(tuple):
+    """Hashable stand-in of a nested list, its items after the _LIST_TAG
+    marker."""
+
+    __slots__ = ()
+
+
+# Markers keep frozen dicts and lists of equal items from comparing equal
+_DICT_TAG = _Missing()
+_LIST_TAG = _Missing()
+
+
+class CompactRecord(object):
+    """Read-only view of one record of a CompactRecords instance."""
+
+    __slots__ = ("_records", "_index")
+
+    def __init__(self, records, index):
+        self._records = records
+        self._index = index
+
+    def get(self, key, default=None):
+        return self._records.get(self._index, key, default)
+
+    def __getitem__(self, key):
+        value = self._records.get(self._index, key, MISSING)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self):
+        return self._records.to_dict(self._index)
+
+
+class CompactRecords(object):
+    """
+    Columnar store for records sharing mostly the same keys, such as the
+    computers returned by the computers endpoint.
+
+    Every key is stored as one column list instead of one dict per record, and
+    repeated values (OS names, group and domain dicts, versions) are interned so
+    that every distinct value is held only once. Nested dicts and lists are kept
+    as hashable tuples and only turned back into dicts and lists on output.
+    """
+
+    def __init__(self, records=None):
+        self._columns = {}
+        self._keys = []
+        self._count = 0
+        self._strings = {}
+        self._dicts = {}
+        self._lists = {}
+        if records is not None:
+            self.extend(records)
+
+    def __len__(self):
+        return self._count
+
+    def _intern(self, value):
+        return self._freeze(value)[0]
+
+    def _freeze(self, value):
+        """Intern a value.
+
+        Frozen dicts and lists are interned by a key holding the type of
+        their numbers and booleans, so that equal values of different types
+        such as 1, 1.0 and True are not merged. Values without any are
+        their own key.
+
+        :return: Tuple of the interned value and its key.
+        """
+        if isinstance(value, string_types):
+            value = self._strings.setdefault(value, value)
+            return value, value
+        if isinstance(value, dict):
+            items = [(self._freeze(k), self._freeze(v)) for k, v in iteritems(value)]
+            return self._freeze_items(
+                self._dicts,
+                _FrozenDict((_DICT_TAG,) + tuple((k[0], v[0]) for k, v in items)),
+                (_DICT_TAG,) + tuple((k[1], v[1]) for k, v in items),
+                all(k[0] is k[1] and v[0] is v[1] for k, v in items),
+            )
+        if isinstance(value, list):
+            items = [self._freeze(v) for v in value]
+            return self._freeze_items(
+                self._lists,
+                _FrozenList((_LIST_TAG,) + tuple(v[0] for v in items)),
+                (_LIST_TAG,) + tuple(v[1] for v in items),
+                all(v[0] is v[1] for v in items),
+            )
+        if value is None:
+            return value, value
+        return value, (type(value), value)
+
+    @staticmethod
+    def _freeze_items(interned, frozen, key, plain):
+        # Values without numbers or booleans are their own key
+        if plain:
+            frozen = interned.setdefault(frozen, frozen)
+            return frozen, frozen
+        return interned.setdefault(key, frozen), key
+
+    def _expand(self, value):
+        if isinstance(value, _FrozenDict):
+            return dict((k, self._expand(v)) for k, v in value[1:])
+        if isinstance(value, _FrozenList):
+            return [self._expand(v) for v in value[1:]]
+        return value
+
+    def append(self, record):
+        """Add a record.
+
+        :param record: Record dict.
+        """
+        columns = self._columns
+        intern = self._intern
+        for key in record:
+            if key not in columns:
+                self._keys.append(key)
+                columns[key] = [MISSING] * self._count
+        for key in self._keys:
+            columns[key].append(intern(record.get(key, MISSING)))
+        self._count += 1
+
+    def extend(self, records):
+        """Add records, e.g. straight from Sepclient.iter_computers.
+
+        :param records: Iterable of record dicts.
+        """
+        for record in records:
+            self.append(record)
+
+    def get(self, index, key, default=None):
+        """Get the value of a key of the record at index.
+
+        :return: The value, default if the record does not have the key.
+        """
+        column = self._columns.get(key)
+        if column is None or column[index] is MISSING:
+            return default
+        return self._expand(column[index])
+
+    def column(self, key, default=None):
+        """Iterate over the values of a key in all records.
+
+        :param key: Record key.
+        :param default: Value for the records that do not have the key.
+        :return: Generator of values.
+        """
+        column = self._columns.get(key)
+        if column is None:
+            for dummy in range(self._count):
+                yield default
+            return
+        for value in column:
+            yield default if value is MISSING else self._expand(value)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield CompactRecord(self, index)
+
+    def where(self, predicate):
+        """Find the records matching a predicate.
+
+        :param predicate: Callable taking a CompactRecord.
+        :return: List of record indexes.
+        """
+        return [
+            index
+            for index in range(self._count)
+            if predicate(CompactRecord(self, index))
+        ]
+
+    def index_by(self, key):
+        """Index the records by the value of a key. Values must be hashable.
+
+        :param key: Record key.
+        :return: Dict of value to list of record indexes.
+        """
+        index = {}
+        for position, value in enumerate(self._columns.get(key, [])):
+            if value is not MISSING:
+                index.setdefault(value, []).append(position)
+        return index
+
+    def to_dict(self, index):
+        """Convert the record at index back to a dict."""
+        return dict(
+            (key, self._expand(self._columns[key][index]))
+            for key in self._keys
+            if self._columns[key][index] is not MISSING
+        )
+
+    def to_dicts(self, indexes=None):
+        """Convert records back to dicts for output.
+
+        :param indexes: Record indexes, defaults to all records.
+        :return: List of dicts.
+        """
+        if indexes is None:
+            indexes = range(self._count)
+        return [self.to_dict(index) for index in indexes]
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Bounded fan-out of Symantec EPM API calls """
+
+import threading
+
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.six.moves import queue
+
+from ansible_collections.symantec.epm.plugins.module_utils.requests_sep import (
+    SepRequestError,
+)
+
+DEFAULT_CONCURRENCY = 4
+
+
+def chunked(items, size):
+    """Split a list into consecutive chunks of at most size items.
+
+    :param items: The list to split.
+    :param size: Maximum number of items per chunk.
+    :return: List of lists.
+    """
+    size = max(1, int(size))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def call_each(sclient, func, items):
+    """Call func once for every item, one after the other, with the failed
+    API calls raising SepRequestError instead of failing the module, so that
+    callers can report failures per item.
+
+    :param sclient: Sepclient instance func makes its calls with.
+    :param func: Callable taking a single item.
+    :param items: Iterable of items.
+    :return: Generator of (item, result, exception) tuples in the order of
+             items, the exception is a SepRequestError or ConnectionError.
+    """
+    for item in items:
+        try:
+            with sclient.raising_errors():
+                result = func(item)
+        except (SepRequestError, ConnectionError) as e:
+            yield item, None, e
+        else:
+            yield item, result, None
+
+
+def run_concurrently(func, items, max_workers=DEFAULT_CONCURRENCY):
+    """Call func once for every item using at most max_workers threads.
+
+    Exceptions raised by func are caught and returned for the item that raised
+    them so that callers can report failures per item.
+
+    The threads share the persistent connection, whose process serves one
+    request at a time, so API requests are not sent in parallel. Only the
+    work of the module around the requests, such as encoding and decoding
+    the payloads, overlaps.
+
+    :param func: Callable taking a single item.
+    :param items: List of items.
+    :param max_workers: Maximum number of calls in flight at the same time.
+    :return: List of (item, result, exception) tuples in the order of items.
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    work = queue.Queue()
+    for index, item in enumerate(items):
+        work.put((index, item))
+
+    def worker():
+        while True:
+            try:
+                index, item = work.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[index] = (item, func(item), None)
+            except Exception as e:
+                results[index] = (item, None, e)
+
+    workers = [
+        threading.Thread(target=worker)
+        for dummy in range(min(max(1, int(max_workers)), len(items)))
+    ]
+    for thread in workers:
+        thread.daemon = True
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return results
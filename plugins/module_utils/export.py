@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Streaming export of Symantec EPM records to local files """
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from ansible.module_utils.six import PY3, iteritems
+from ansible.module_utils._text import to_bytes, to_text
+
+EXPORT_FORMATS = ["ndjson", "csv"]
+
+# Options shared by all export modules
+EXPORT_ARGSPEC = dict(
+    path=dict(required=True, type="path"),
+    format=dict(required=False, type="str", choices=EXPORT_FORMATS, default="ndjson"),
+    compress=dict(required=False, type="bool", default=False),
+    fields=dict(required=False, type="list", elements="str"),
+)
+
+
+class _HashingFile(object):
+    """Write-only file wrapper computing the SHA256 checksum of the data written."""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self.hash = hashlib.sha256()
+
+    def write(self, data):
+        self.hash.update(data)
+        return self._fileobj.write(data)
+
+    def flush(self):
+        self._fileobj.flush()
+
+
+class RecordWriter(object):
+    """
+    Write records to a temporary file next to path as they arrive, either as
+    newline delimited JSON or as CSV, optionally gzip compressed. Only the row
+    being written is held in memory.
+
+    The CSV header needs the columns before the first row, without fields
+    they are the keys of all the records. The records are then spooled as
+    newline delimited JSON to an unnamed temporary file and written as CSV
+    once all of them are known.
+    """
+
+    def __init__(self, path, fmt="ndjson", compress=False, fields=None):
+        """
+        Class constructor
+
+        :param path: Destination path, the temporary file is created in its directory.
+        :param fmt: One of EXPORT_FORMATS.
+        :param compress: Whether to gzip compress the output.
+        :param fields: CSV columns, defaults to the keys of all the records
+                       in the order they first appear.
+        """
+        self.path = path
+        self.fmt = fmt
+        self.compress = compress
+        self.fields = fields
+        self.rows = 0
+        self.tmp_path = None
+        self._raw = self._hashing = self._gzip = self._out = None
+        self._csv = self._row = None
+        self._spool = None
+        self._spool_fields = []
+        self._spool_keys = set()
+
+    def __enter__(self):
+        fd, self.tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or ".", prefix=".symantec_epm_export"
+        )
+        self._raw = os.fdopen(fd, "wb")
+        self._hashing = _HashingFile(self._raw)
+        self._out = self._hashing
+        if self.compress:
+            # Fixed name and mtime so that identical data gives identical files
+            self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._hashing, mtime=0)
+            self._out = self._gzip
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self._write_spool()
+        finally:
+            self.close()
+        if exc_type is not None and os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        return False
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        if self._raw is None:
+            return
+        if self._gzip is not None:
+            self._gzip.close()
+        self._raw.close()
+        self._raw = None
+
+    @property
+    def checksum(self):
+        """SHA256 hex digest of the file, available once closed."""
+        return self._hashing.hash.hexdigest()
+
+    @staticmethod
+    def _csv_value(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, sort_keys=True)
+        return value
+
+    def _write_csv(self, record):
+        if self._csv is None:
+            # Rows are formatted one at a time in a small text buffer
+            self._row = io.StringIO() if PY3 else io.BytesIO()
+            self._csv = csv.DictWriter(
+                self._row, fieldnames=self.fields, extrasaction="ignore"
+            )
+            self._csv.writeheader()
+        self._csv.writerow(
+            dict((k, self._csv_value(v)) for k, v in iteritems(record))
+        )
+        self._out.write(to_bytes(self._row.getvalue()))
+        self._row.seek(0)
+        self._row.truncate()
+
+    def _spool_record(self, record):
+        if self._spool is None:
+            self._spool = tempfile.TemporaryFile(
+                dir=os.path.dirname(self.tmp_path), prefix=".symantec_epm_spool"
+            )
+        for key in record:
+            if key not in self._spool_keys:
+                self._spool_keys.add(key)
+                self._spool_fields.append(key)
+        self._spool.write(to_bytes(json.dumps(record)) + b"\n")
+
+    def _write_spool(self):
+        """Write the spooled records as CSV, with all their keys as columns."""
+        if self._spool is None:
+            return
+        self.fields = self._spool_fields
+        self._spool.seek(0)
+        for line in self._spool:
+            self._write_csv(json.loads(to_text(line)))
+
+    def write(self, record):
+        """Write a record.
+
+        :param record: Record dict.
+        """
+        if self.fmt == "csv" and self.fields is None:
+            self._spool_record(record)
+        elif self.fmt == "csv":
+            self._write_csv(record)
+        else:
+            if self.fields is not None:
+                record = dict((k, record.get(k)) for k in self.fields)
+            self._out.write(to_bytes(json.dumps(record, sort_keys=True)) + b"\n")
+        self.rows += 1
+
+
+def export_records(module, sclient, records):
+    """Stream records to the file given by the EXPORT_ARGSPEC options of a module
+    and move it into place, unless an identical file already exists.
+
+    :param module: AnsibleModule instance.
+    :param sclient: Sepclient instance the records are fetched with.
+    :param records: Iterable of record dicts, e.g. from Sepclient.iter_computers.
+    :return: Dict with path, rows, checksum and changed.
+    """
+    path = module.params["path"]
+    directory = os.path.dirname(path) or "."
+    if not os.path.isdir(directory):
+        module.fail_json(
+            msg="Destination directory {0} does not exist".format(directory),
+            flow_control=sclient.flow_control_state(),
+        )
+    if not os.access(directory, os.W_OK):
+        module.fail_json(
+            msg="Destination directory {0} is not writable".format(directory),
+            flow_control=sclient.flow_control_state(),
+        )
+    with RecordWriter(
+        path,
+        fmt=module.params["format"],
+        compress=module.params["compress"],
+        fields=module.params["fields"],
+    ) as writer:
+        for record in records:
+            writer.write(record)
+
+    changed = not (os.path.exists(path) and module.sha256(path) == writer.checksum)
+    if changed:
+        module.atomic_move(writer.tmp_path, path)
+    else:
+        os.remove(writer.tmp_path)
+
+    return dict(path=path, rows=writer.rows, checksum=writer.checksum, changed=changed)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Local membership index of Symantec EPM fingerprint lists """
+
+import json
+import os
+import tempfile
+import time
+
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    call_each,
+)
+
+CACHE_VERSION = 2
+DEFAULT_MAX_AGE = 300
+
+
+def normalize_hash(hash_value):
+    """Hash values are compared case insensitively."""
+    return hash_value.strip().upper()
+
+
+class FingerprintIndex(object):
+    """
+    Membership index of the hashes of fingerprint lists, optionally cached in
+    a local JSON file.
+
+    Lookups are a dict lookup of the hash in the index of all the hashes of
+    the lists, so results are exact. Each list is fetched again only once its
+    cached copy is older than max_age, lists cached but not used by a run are
+    kept as they are.
+
+    The cache file is only readable by its owner and records the manager
+    host and the user the lists were fetched with, it is not used by
+    connections to another one.
+    """
+
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE):
+        """
+        Class constructor
+
+        :param path: Cache file path, None to not cache the lists.
+        :param max_age: Seconds a cached list is used without being fetched again.
+        """
+        self.path = os.path.abspath(os.path.expanduser(path)) if path else None
+        self.max_age = max_age
+        self.lists = {}
+        self.fetched = []
+        self.missing = []
+        self._members = {}
+
+    def _read(self, identity):
+        # A file which cannot be read or is not a cache of this manager and
+        # user is a miss, the lists are then fetched again and it is replaced
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, "r") as cache_file:
+                cached = json.load(cache_file)
+        except Exception:
+            return {}
+        if (
+            not isinstance(cached, dict)
+            or cached.get("version") != CACHE_VERSION
+            or cached.get("host") != identity.get("host")
+            or cached.get("user") != identity.get("user")
+            or not isinstance(cached.get("lists"), dict)
+        ):
+            return {}
+        return cached["lists"]
+
+    @staticmethod
+    def _valid(entry):
+        if not isinstance(entry, dict) or not isinstance(entry.get("hashes"), list):
+            return False
+        fetch_time = entry.get("time")
+        return not isinstance(fetch_time, bool) and isinstance(fetch_time, (int, float))
+
+    def _write(self, identity, lists):
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".symantec_epm_fingerprints")
+        with os.fdopen(fd, "w") as cache_file:
+            json.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "host": identity.get("host"),
+                    "user": identity.get("user"),
+                    "lists": lists,
+                },
+                cache_file,
+            )
+        os.chmod(tmp_path, 0o600)
+        os.rename(tmp_path, self.path)
+
+    @staticmethod
+    def _cache_key(name, domain_id):
+        return "{0}/{1}".format(domain_id or "", name)
+
+    def load(self, sclient, names, domain_id=None):
+        """Load fingerprint lists, from the cache when fresh, otherwise from the
+        manager, one after the other.
+
+        :param sclient: Sepclient instance.
+        :param names: Fingerprint list names.
+        :param domain_id: Domain of the lists, defaults to the logged-on domain.
+        :raises SepRequestError: If a list cannot be fetched.
+        """
+        identity = sclient.connection_identity() if self.path is not None else {}
+        cached = self._read(identity)
+        now = time.time()
+        stale = []
+        for name in names:
+            entry = cached.get(self._cache_key(name, domain_id))
+            if self._valid(entry) and now - entry["time"] <= self.max_age:
+                self.lists[name] = entry
+            else:
+                stale.append(name)
+
+        for name, response, error in call_each(
+            sclient,
+            lambda name: sclient.get_fingerprint_list(
+                domainid=domain_id, fingerprintlist_name=name
+            ),
+            stale,
+        ):
+            if error is not None:
+                raise error
+            if not isinstance(response, dict) or "errorCode" in response:
+                # Unknown lists are answered with a 410 error
+                self.missing.append(name)
+                continue
+            self.fetched.append(name)
+            self.lists[name] = cached[self._cache_key(name, domain_id)] = {
+                "id": response.get("id"),
+                "hashes": [normalize_hash(h) for h in response.get("data") or []],
+                "time": now,
+            }
+
+        if self.path is not None and self.fetched:
+            self._write(identity, cached)
+        self._build()
+
+    def _build(self):
+        self._members = {}
+        for name in sorted(self.lists):
+            for hash_value in self.lists[name]["hashes"]:
+                self._members.setdefault(hash_value, []).append(name)
+
+    def lookup(self, hash_value):
+        """Find the lists containing a hash.
+
+        :param hash_value: MD5, SHA-1 or SHA256 hash.
+        :return: List of fingerprint list names, empty if none.
+        """
+        return self._members.get(normalize_hash(hash_value), [])
+
+    def partition(self, hashes):
+        """Split hashes by whether any of the lists contains them.
+
+        :param hashes: Iterable of hashes.
+        :return: Tuple of (dict of hash to list names, list of hashes in no list).
+        """
+        present = {}
+        absent = []
+        for hash_value in hashes:
+            names = self.lookup(hash_value)
+            if names:
+                present[hash_value] = names
+            else:
+                absent.append(hash_value)
+        return present, absent
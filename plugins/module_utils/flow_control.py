@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Adaptive concurrency limit, circuit breaker and statistics of Symantec EPM API calls """
+
+import json
+import threading
+import time
+
+
+class AdaptiveLimiter(object):
+    """
+    Concurrency limit adjusted with additive increase / multiplicative
+    decrease (AIMD): every fast, successful call raises the limit by 1/limit,
+    so by about one per round of calls, while a failed or slow call cuts it
+    by backoff.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, latency_target=5.0, backoff=0.5):
+        """
+        Class constructor
+
+        :param initial: Initial number of calls allowed in flight.
+        :param minimum: Lower bound of the limit.
+        :param maximum: Upper bound of the limit.
+        :param latency_target: Seconds above which a call counts as slow.
+        :param backoff: Factor applied to the limit on a failed or slow call.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        return max(self.minimum, int(self._limit))
+
+    def acquire(self):
+        """Block until a call may be started."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency=0, success=True, adjust=True):
+        """Finish a call and adjust the limit.
+
+        :param latency: Duration of the call in seconds.
+        :param success: Whether the call succeeded.
+        :param adjust: Whether to adjust the limit, not for a call that was
+                       never sent.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if adjust and (not success or latency > self.latency_target):
+                self._limit = max(self.minimum, self._limit * self.backoff)
+            elif adjust:
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def state(self):
+        with self._cond:
+            return {"limit": self.limit, "in_flight": self._in_flight}
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker shared by all calls of a client. It opens after
+    failure_threshold consecutive failures and rejects calls until
+    reset_timeout has passed, then lets a single probe call through
+    (half-open) which either closes it again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Class constructor
+
+        :param failure_threshold: Consecutive failures that open the breaker.
+        :param reset_timeout: Seconds the breaker stays open before a probe.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Check whether a call may be made now.
+
+        :return: True if the call may proceed.
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.time() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, success):
+        """Record the outcome of a call that was allowed.
+
+        :param success: Whether the call succeeded.
+        """
+        with self._lock:
+            if success:
+                self._failures = 0
+                self._state = self.CLOSED
+                self._probing = False
+                return
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._trips += 1
+                self._state = self.OPEN
+                self._opened_at = time.time()
+                self._probing = False
+
+    def state(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "trips": self._trips,
+            }
+
+
+class CallStats(object):
+    """
+    Counters of the calls made by a client, reported with the module results
+    so that the API cost of each task can be aggregated, e.g. by the
+    symantec.epm.api_cost callback.
+
+    Response sizes are estimated from their JSON encoding, pages from the
+    size of their first record.
+    """
+
+    def __init__(self):
+        self._calls = 0
+        self._pages = 0
+        self._errors = 0
+        self._seconds = 0.0
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(response):
+        if isinstance(response, dict) and isinstance(response.get("content"), list):
+            content = response["content"]
+            return len(json.dumps(content[0])) * len(content) if content else 0
+        try:
+            return len(json.dumps(response))
+        except (TypeError, ValueError):
+            return 0
+
+    def record(self, latency, success, data=None, response=None):
+        """Record a call.
+
+        :param latency: Seconds the call took.
+        :param success: Whether the call succeeded, error responses count as failures.
+        :param data: Request body.
+        :param response: Decoded response.
+        """
+        size = self._size(response) if response is not None else 0
+        with self._lock:
+            self._calls += 1
+            if isinstance(response, dict) and "content" in response:
+                self._pages += 1
+            if not success:
+                self._errors += 1
+            self._seconds += latency
+            self._bytes_sent += len(data) if data else 0
+            self._bytes_received += size
+
+    def state(self):
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "pages": self._pages,
+                "errors": self._errors,
+                "seconds": round(self._seconds, 3),
+                "bytes_sent": self._bytes_sent,
+                "bytes_received": self._bytes_received,
+            }
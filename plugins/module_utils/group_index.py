@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" In-memory index of the Symantec EPM group hierarchy """
+
+from ansible.module_utils._text import to_text
+
+# SEPM separates the levels of a group's fullPathName with a backslash,
+# e.g. "My Company\\Servers\\Linux"
+GROUP_PATH_SEPARATOR = u"\\"
+
+
+def split_group_path(path):
+    """Split a group full path name into its levels.
+
+    Leading, trailing and doubled separators are ignored so that
+    "My Company\\Servers\\" and "My Company\\Servers" are the same path.
+
+    :param path: The group full path name.
+    :return: List of path levels.
+    """
+    return [
+        part.strip()
+        for part in to_text(path).split(GROUP_PATH_SEPARATOR)
+        if part.strip()
+    ]
+
+
+def normalize_group_path(path):
+    """Normalize a group full path name for lookups. SEPM group names are
+    case insensitive.
+
+    :param path: The group full path name.
+    :return: Normalized path used as index key.
+    """
+    return GROUP_PATH_SEPARATOR.join(split_group_path(path)).lower()
+
+
+class GroupIndex(object):
+    """
+    Index of the groups of a SEPM domain, built once from the flat list
+    returned by the groups endpoint.
+
+    Ancestor paths are precomputed at build time so that path to ID
+    resolution is a dict lookup and subtree expansion does not need any
+    further query to the Endpoint Protection Manager.
+    """
+
+    def __init__(self, groups):
+        """
+        Class constructor
+
+        :param groups: List of group dicts as returned by Sepclient.get_groups
+        """
+        self._groups = {}
+        self._order = []
+        self._path_to_id = {}
+        self._parent = {}
+        self._children = {}
+        self._ancestors = {}
+
+        for group in groups:
+            if "id" not in group or "fullPathName" not in group:
+                continue
+            if group["id"] not in self._groups:
+                self._order.append(group["id"])
+            self._groups[group["id"]] = group
+            self._path_to_id[normalize_group_path(group["fullPathName"])] = group["id"]
+            self._children.setdefault(group["id"], [])
+
+        for group_id in self._order:
+            group = self._groups[group_id]
+            levels = split_group_path(group["fullPathName"])
+            ancestors = []
+            for depth in range(1, len(levels)):
+                ancestor_id = self._path_to_id.get(
+                    GROUP_PATH_SEPARATOR.join(levels[:depth]).lower()
+                )
+                if ancestor_id is not None:
+                    ancestors.append(ancestor_id)
+            self._ancestors[group_id] = tuple(ancestors)
+            if ancestors:
+                self._parent[group_id] = ancestors[-1]
+                self._children[ancestors[-1]].append(group_id)
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __contains__(self, group_id):
+        return group_id in self._groups
+
+    def get(self, group_id):
+        """Get a group by its ID.
+
+        :param group_id: The group ID.
+        :return: The group dict or None.
+        """
+        return self._groups.get(group_id)
+
+    def id_for_path(self, path):
+        """Resolve a group full path name to its ID.
+
+        :param path: The group full path name, e.g. "My Company\\Servers".
+        :return: The group ID or None if no such group exists.
+        """
+        return self._path_to_id.get(normalize_group_path(path))
+
+    def resolve(self, group):
+        """Resolve a group given either by ID or by full path name.
+
+        :param group: A group ID or full path name.
+        :return: The group ID or None if no such group exists.
+        """
+        if group in self._groups:
+            return group
+        return self.id_for_path(group)
+
+    def parent(self, group_id):
+        """Get the ID of the parent group, None for a top level group."""
+        return self._parent.get(group_id)
+
+    def ancestors(self, group_id):
+        """Get the IDs of all ancestors of a group, top level group first.
+
+        :param group_id: The group ID.
+        :return: Tuple of group IDs.
+        """
+        return self._ancestors.get(group_id, ())
+
+    def ancestor_paths(self, group_id):
+        """Get the full path names of all ancestors of a group, top level
+        group first.
+
+        :param group_id: The group ID.
+        :return: List of full path names.
+        """
+        return [
+            self._groups[ancestor_id]["fullPathName"]
+            for ancestor_id in self.ancestors(group_id)
+        ]
+
+    def subtree(self, group_id, include_self=True):
+        """Expand a group to the IDs of all groups below it.
+
+        :param group_id: The group ID.
+        :param include_self: Whether to include group_id itself.
+        :return: List of group IDs, parents before their children.
+        """
+        if group_id not in self._groups:
+            return []
+        subtree = [group_id] if include_self else []
+        pending = list(reversed(self._children[group_id]))
+        while pending:
+            current = pending.pop()
+            subtree.append(current)
+            pending.extend(reversed(self._children[current]))
+        return subtree
+
+    def groups(self, group_ids=None):
+        """Get group dicts for the given IDs, or all groups.
+
+        :param group_ids: Iterable of group IDs, defaults to all groups.
+        :return: List of group dicts.
+        """
+        if group_ids is None:
+            group_ids = self._order
+        return [self._groups[group_id] for group_id in group_ids if group_id in self._groups]
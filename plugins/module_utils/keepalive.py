@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" HTTP keep-alive connection pool with TLS session resumption """
+
+import socket
+import ssl
+import threading
+
+from ansible.module_utils.six.moves import http_client
+
+# Methods sent again when a reused connection fails after sending them, the
+# server may have processed the request before the connection was closed
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+
+
+class _PooledHTTPSConnection(http_client.HTTPSConnection):
+    """HTTPS connection resuming the last TLS session of its pool."""
+
+    def __init__(self, pool, host, port, timeout):
+        http_client.HTTPSConnection.__init__(
+            self, host, port, timeout=timeout, context=pool.ssl_context
+        )
+        self._pool = pool
+
+    def connect(self):
+        http_client.HTTPConnection.connect(self)
+        kwargs = {"server_hostname": self.host}
+        if self._pool.tls_session is not None:
+            kwargs["session"] = self._pool.tls_session
+        self.sock = self._pool.ssl_context.wrap_socket(self.sock, **kwargs)
+        self._pool.count("handshakes")
+        if getattr(self.sock, "session_reused", False):
+            self._pool.count("resumed_sessions")
+
+
+class KeepAlivePool(object):
+    """
+    Pool of persistent HTTP(S) connections to one server. Connections are
+    kept open between requests, and new TLS connections resume the session
+    of the previous one, so that only the first request of a session pays
+    for the full TCP and TLS handshake.
+
+    When a reused connection fails, the request is sent again on a new one
+    if it had not been sent completely or its method is idempotent. POST
+    and PATCH requests that may have reached the server are never sent twice.
+
+    Counters: requests, connections (opened), reused (requests sent over an
+    already open connection), handshakes (TLS), resumed_sessions (TLS
+    handshakes that resumed a session) and retries (requests sent again
+    after the server closed an idle connection).
+    """
+
+    def __init__(self, host, port, use_ssl=True, validate_certs=True, timeout=30, maxsize=4):
+        """
+        Class constructor
+
+        :param host: Server host name.
+        :param port: Server port.
+        :param use_ssl: Whether to use HTTPS.
+        :param validate_certs: Whether to validate the server certificate.
+        :param timeout: Socket timeout in seconds.
+        :param maxsize: Number of idle connections kept open.
+        """
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self.tls_session = None
+        self.ssl_context = None
+        if use_ssl:
+            self.ssl_context = ssl.create_default_context()
+            if not validate_certs:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.stats = dict(
+            requests=0,
+            connections=0,
+            reused=0,
+            handshakes=0,
+            resumed_sessions=0,
+            retries=0,
+        )
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def count(self, counter):
+        with self._lock:
+            self.stats[counter] += 1
+
+    def _get(self):
+        with self._lock:
+            if self._idle:
+                self.stats["reused"] += 1
+                return self._idle.pop(), True
+            self.stats["connections"] += 1
+        if self.use_ssl:
+            return _PooledHTTPSConnection(self, self.host, self.port, self.timeout), False
+        return http_client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _put(self, conn):
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, url, body=None, headers=None):
+        """Send a request and read its response.
+
+        :param method: HTTP method.
+        :param url: URL path with query string.
+        :param body: Request body.
+        :param headers: Request headers.
+        :return: Tuple of (response, response body). The response is read
+                 already, its status and headers remain available.
+        """
+        self.count("requests")
+        while True:
+            conn, reused = self._get()
+            sent = False
+            try:
+                conn.request(method, url, body=body, headers=headers or {})
+                sent = True
+                response = conn.getresponse()
+                data = response.read()
+            except (http_client.HTTPException, socket.error) as e:
+                conn.close()
+                # A timeout may mean that the server got the request
+                if not reused or isinstance(e, socket.timeout):
+                    raise
+                if sent and method.upper() not in IDEMPOTENT_METHODS:
+                    raise
+                # The server closed the idle connection, send on a new one
+                self.count("retries")
+                continue
+            if self.use_ssl and getattr(conn.sock, "session", None) is not None:
+                # TLS 1.3 tickets only arrive with the first response
+                self.tls_session = conn.sock.session
+            if response.will_close:
+                conn.close()
+            else:
+                self._put(conn)
+            return response, data
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Compiled wildcard matching of Symantec EPM records """
+
+import re
+
+from ansible.module_utils.six import integer_types, string_types, text_type
+
+# Values of the online status of computers
+ONLINE_STATUS = {"online": "1", "offline": "0"}
+
+
+def compile_wildcard(patterns):
+    """Compile wildcard patterns, where '*' matches any characters like in
+    the API queries, into a single case insensitive regular expression.
+
+    :param patterns: Pattern, or list of patterns any of which may match.
+    :return: Compiled regular expression matching whole values.
+    """
+    if isinstance(patterns, string_types):
+        patterns = [patterns]
+    return re.compile(
+        "^(?:{0})$".format(
+            "|".join(
+                ".*".join(re.escape(part) for part in text_type(pattern).split("*"))
+                for pattern in patterns
+            )
+        ),
+        re.IGNORECASE,
+    )
+
+
+def pattern_list(patterns):
+    """Normalize a pattern or a list of patterns to a list of text patterns.
+
+    Numbers and booleans are matched as text, like the values of the records,
+    e.g. 1 matches a field holding 1 and true matches a field holding true.
+
+    :param patterns: Pattern, or list of patterns.
+    :return: List of text patterns.
+    :raises TypeError: If a pattern is not a string, a number or a boolean.
+    """
+    if not isinstance(patterns, list):
+        patterns = [patterns]
+    for pattern in patterns:
+        if not isinstance(pattern, string_types + integer_types + (bool, float)):
+            raise TypeError(
+                "patterns must be strings, numbers or booleans, not {0}".format(
+                    type(pattern).__name__
+                )
+            )
+    return [
+        pattern if isinstance(pattern, string_types) else text_type(pattern)
+        for pattern in patterns
+    ]
+
+
+def normalize_mac(mac):
+    """MAC addresses are compared without separators."""
+    return re.sub("[^0-9A-Za-z*]", "", mac)
+
+
+class RecordMatcher(object):
+    """
+    Filter of records by wildcard patterns on their fields, compiled once and
+    applied to each page of records as it is received.
+
+    A record matches when every field matches one of its patterns, fields
+    holding a list match when any element does.
+    """
+
+    def __init__(self, fields, normalizers=None):
+        """
+        Class constructor
+
+        :param fields: Dict of field name to pattern or list of patterns, see
+                       pattern_list.
+        :param normalizers: Dict of field name to a function applied to the
+                            patterns and the values before matching.
+        """
+        self._normalizers = normalizers or {}
+        self._fields = [
+            (field, compile_wildcard(self._normalize_patterns(field, patterns)))
+            for field, patterns in sorted(fields.items())
+        ]
+
+    def _normalize_patterns(self, field, patterns):
+        normalize = self._normalizers.get(field)
+        return [normalize(p) if normalize else p for p in pattern_list(patterns)]
+
+    def __bool__(self):
+        return bool(self._fields)
+
+    __nonzero__ = __bool__
+
+    def match(self, record):
+        for field, regex in self._fields:
+            values = record.get(field)
+            if not isinstance(values, list):
+                values = [values]
+            normalize = self._normalizers.get(field)
+            if not any(
+                regex.match(normalize(text_type(v)) if normalize else text_type(v))
+                for v in values
+                if v is not None
+            ):
+                return False
+        return True
+
+    def filter(self, records):
+        """Keep the matching records.
+
+        :param records: List of record dicts.
+        :return: List of the matching records.
+        """
+        return [record for record in records if self.match(record)]
+
+
+def computer_matcher(mac=None, status=None, status_details=None):
+    """Build the matcher of the computer filters the API does not apply.
+
+    :param mac: MAC address pattern, checked against all the addresses of
+                the computers in case the manager ignored it.
+    :param status: Online status, online or offline.
+    :param status_details: Dict of computer field to pattern or list of patterns.
+    :return: RecordMatcher, false when there is nothing to filter.
+    """
+    fields = dict(status_details or {})
+    if mac:
+        fields["macAddresses"] = mac
+    if status:
+        fields["onlineStatus"] = ONLINE_STATUS[status.lower()]
+    return RecordMatcher(fields, normalizers={"macAddresses": normalize_mac})
+
+
+class NameSet(object):
+    """
+    Set of computer names and wild card patterns, matched case insensitively.
+
+    Names without wild card are looked up in a hash set, so matching the
+    records of a full fetch against many names is a hash join, patterns are
+    checked one by one.
+    """
+
+    def __init__(self, names):
+        """
+        Class constructor
+
+        :param names: List of names, wild card is supported as '*'.
+        """
+        self.names = list(names)
+        self._exact = set(
+            text_type(name).lower() for name in self.names if "*" not in name
+        )
+        self._patterns = [
+            (name, compile_wildcard(name)) for name in self.names if "*" in name
+        ]
+
+    def match(self, name):
+        if name is None:
+            return False
+        name = text_type(name)
+        return name.lower() in self._exact or any(
+            regex.match(name) for dummy, regex in self._patterns
+        )
+
+    def unmatched(self, found):
+        """Find the names and patterns matching none of the names found.
+
+        :param found: Iterable of the names found.
+        :return: List of names and patterns, in the given order.
+        """
+        found = set(text_type(name).lower() for name in found if name is not None)
+        missing_patterns = set(
+            name
+            for name, regex in self._patterns
+            if not any(regex.match(candidate) for candidate in found)
+        )
+        return [
+            name
+            for name in self.names
+            if name in missing_patterns
+            or ("*" not in name and text_type(name).lower() not in found)
+        ]
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Symantec EPM API metrics in the Prometheus text exposition format """
+
+import fcntl
+import os
+import re
+import tempfile
+import threading
+import time
+
+# Upper bounds of the request latency histogram buckets, in seconds
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+# Metric family name to (type, help)
+FAMILIES = {
+    "symantec_epm_requests_total": (
+        "counter",
+        "Requests sent to the Symantec Endpoint Protection Manager API.",
+    ),
+    "symantec_epm_request_duration_seconds": (
+        "histogram",
+        "Latency of the Symantec Endpoint Protection Manager API requests.",
+    ),
+    "symantec_epm_request_bytes_total": (
+        "counter",
+        "Bytes of the bodies of the requests sent.",
+    ),
+    "symantec_epm_response_bytes_total": (
+        "counter",
+        "Bytes of the bodies of the responses received.",
+    ),
+    "symantec_epm_rate_limited_total": (
+        "counter",
+        "Requests rejected by rate limiting (HTTP 429).",
+    ),
+    "symantec_epm_retries_total": (
+        "counter",
+        "Requests sent again, by reason.",
+    ),
+    "symantec_epm_metrics_last_update_timestamp_seconds": (
+        "gauge",
+        "Time the metrics were last written.",
+    ),
+}
+
+# Path segments which are IDs, replaced to keep the number of series bounded
+_ID_SEGMENT = re.compile(
+    r"^([0-9]+|[0-9A-Fa-f]{32}|[0-9A-Fa-f]{8}(-[0-9A-Fa-f]{4}){3}-[0-9A-Fa-f]{12})$"
+)
+_SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(.*)\})?\s+(\S+)$")
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def endpoint(url):
+    """Endpoint of a request URL, without the query string and with IDs
+    replaced by {id}.
+
+    :param url: Request URL or path.
+    :return: Path template, e.g. /sepm/api/v1/command-queue/{id}.
+    """
+    path = url.split("?", 1)[0]
+    if "://" in path:
+        path = "/" + path.split("://", 1)[1].split("/", 1)[-1]
+    return "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _unescape(value):
+    return re.sub(
+        r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), value
+    )
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _sort_key(sample):
+    # Histogram buckets in increasing order of their bounds
+    (name, labels), dummy = sample
+    return name, tuple(
+        (label, float(label_value) if label == "le" else label_value)
+        for label, label_value in labels
+    )
+
+
+class ApiMetrics(object):
+    """
+    Request counters, latency histograms and byte counts of an API session.
+
+    Samples are kept as a dict of (metric name, sorted label tuples) to value.
+    write_textfile adds them to the samples already in the file, so the
+    counters of all the sessions of the controller accumulate in one file
+    read by the node_exporter textfile collector.
+    """
+
+    def __init__(self, host):
+        """
+        Class constructor
+
+        :param host: Host label of the samples.
+        """
+        self.host = host
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def _add(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        self.samples[key] = self.samples.get(key, 0) + value
+
+    def observe(self, method, url, status, latency, sent_bytes, received_bytes):
+        """Record a request sent.
+
+        :param method: HTTP method.
+        :param url: Request URL, reduced to its endpoint.
+        :param status: HTTP status code of the response.
+        :param latency: Seconds until the response was received.
+        :param sent_bytes: Size of the request body.
+        :param received_bytes: Size of the response body.
+        """
+        labels = dict(host=self.host, method=method, endpoint=endpoint(url))
+        with self._lock:
+            self._add("symantec_epm_requests_total", dict(labels, code=str(status)))
+            for bound in LATENCY_BUCKETS + [float("inf")]:
+                if latency <= bound:
+                    self._add(
+                        "symantec_epm_request_duration_seconds_bucket",
+                        dict(labels, le=_format_value(bound)),
+                    )
+            self._add("symantec_epm_request_duration_seconds_sum", labels, latency)
+            self._add("symantec_epm_request_duration_seconds_count", labels)
+            self._add("symantec_epm_request_bytes_total", labels, sent_bytes)
+            self._add("symantec_epm_response_bytes_total", labels, received_bytes)
+            if status == 429:
+                self._add("symantec_epm_rate_limited_total", labels)
+
+    def retry(self, reason, count=1):
+        """Record requests sent again.
+
+        :param reason: Why, e.g. reauthenticate or stale_connection.
+        :param count: Number of requests.
+        """
+        if count:
+            with self._lock:
+                self._add(
+                    "symantec_epm_retries_total",
+                    dict(host=self.host, reason=reason),
+                    count,
+                )
+
+    @staticmethod
+    def parse(text):
+        """Read samples from the text exposition format, comments are skipped.
+
+        :param text: Content of a textfile.
+        :return: Dict of (metric name, sorted label tuples) to value.
+        """
+        samples = {}
+        for line in text.splitlines():
+            match = _SAMPLE.match(line.strip())
+            if not match:
+                continue
+            name, dummy, labels, value = match.groups()
+            labels = tuple(
+                sorted(
+                    (label, _unescape(label_value))
+                    for label, label_value in _LABEL.findall(labels or "")
+                )
+            )
+            try:
+                samples[(name, labels)] = float(value)
+            except ValueError:
+                continue
+        return samples
+
+    @staticmethod
+    def format(samples):
+        """Write samples in the text exposition format, grouped by family.
+
+        :param samples: Dict of (metric name, sorted label tuples) to value.
+        :return: Text ending with a newline.
+        """
+        lines = []
+        for family in sorted(FAMILIES):
+            metric_type, help_text = FAMILIES[family]
+            family_samples = sorted(
+                (
+                    (key, value)
+                    for key, value in samples.items()
+                    if key[0] == family
+                    or (metric_type == "histogram" and key[0].startswith(family + "_"))
+                ),
+                key=_sort_key,
+            )
+            if not family_samples:
+                continue
+            lines.append("# HELP {0} {1}".format(family, help_text))
+            lines.append("# TYPE {0} {1}".format(family, metric_type))
+            for (name, labels), value in family_samples:
+                lines.append(
+                    "{0}{{{1}}} {2}".format(
+                        name,
+                        ",".join(
+                            '{0}="{1}"'.format(label, _escape(label_value))
+                            for label, label_value in labels
+                        ),
+                        _format_value(value),
+                    )
+                    if labels
+                    else "{0} {1}".format(name, _format_value(value))
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Add the samples to the textfile at path, atomically.
+
+        Writers are serialized by a lock file next to it, and the file is
+        replaced by a rename so the collector never reads it half written.
+
+        :param path: Textfile path, must end with .prom to be collected.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(path, "r") as textfile:
+                        samples = self.parse(textfile.read())
+                except (IOError, OSError):
+                    samples = {}
+                with self._lock:
+                    for key, value in self.samples.items():
+                        samples[key] = samples.get(key, 0) + value
+                    self.samples = {}
+                samples[("symantec_epm_metrics_last_update_timestamp_seconds", ())] = (
+                    round(time.time(), 3)
+                )
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".symantec_epm")
+                with os.fdopen(fd, "w") as textfile:
+                    textfile.write(self.format(samples))
+                os.chmod(tmp_path, 0o644)
+                os.rename(tmp_path, path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
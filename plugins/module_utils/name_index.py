@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Cached sorted index of Symantec EPM computer names """
+
+import gzip
+import json
+import os
+import tempfile
+import time
+
+from bisect import bisect_left, bisect_right
+
+from ansible.module_utils.six import string_types, unichr
+from ansible.module_utils.six.moves import range
+from ansible.module_utils._text import to_bytes, to_text
+
+from ansible_collections.symantec.epm.plugins.module_utils.compact_records import (
+    CompactRecords,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.matchers import (
+    compile_wildcard,
+)
+
+INDEX_VERSION = 3
+DEFAULT_MAX_AGE = 300
+
+
+class ComputerNameIndex(object):
+    """
+    Computers of a domain sorted by name, cached in a gzip compressed JSON
+    file only readable by its owner, and fetched again with one paged query
+    once older than max_age. The file records the manager host and the user
+    it was fetched with, and is not used by connections to another one. It
+    holds the computers in name order with their lower case names, so that
+    loading it needs no sort.
+
+    Names are compared case insensitively like the API does. The computers
+    whose names start with a prefix are a contiguous range of the sorted
+    names, found by binary search, so a prefix or exact query is answered in
+    logarithmic time and a wild card query only checks the names in the
+    range of its literal prefix. Patterns starting with '*' have no prefix
+    and check all the names.
+    """
+
+    def __init__(self, path, max_age=DEFAULT_MAX_AGE):
+        """
+        Class constructor
+
+        :param path: Cache file path.
+        :param max_age: Seconds the cached computers are used without being fetched again.
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.max_age = max_age
+        self.fetched = False
+        self.age = 0
+        self._records = CompactRecords()
+        self._names = []
+        self._positions = []
+
+    def __len__(self):
+        return len(self._records)
+
+    def _read(self, domain, identity):
+        # Any file which cannot be read or is not an index of this manager,
+        # user and domain is a miss, it is then fetched again and replaced
+        try:
+            with gzip.open(self.path, "rb") as index_file:
+                cached = json.loads(to_text(index_file.read()))
+        except Exception:
+            return None
+        if not isinstance(cached, dict):
+            return None
+        if (
+            cached.get("version") != INDEX_VERSION
+            or cached.get("host") != identity.get("host")
+            or cached.get("user") != identity.get("user")
+            or cached.get("domain") != domain
+        ):
+            return None
+        fetch_time = cached.get("time")
+        if isinstance(fetch_time, bool) or not isinstance(fetch_time, (int, float)):
+            return None
+        computers = cached.get("computers")
+        names = cached.get("names")
+        if (
+            not isinstance(computers, list)
+            or not isinstance(names, list)
+            or len(names) != len(computers)
+            or not all(isinstance(computer, dict) for computer in computers)
+            or not all(isinstance(name, string_types) for name in names)
+            or any(names[i] > names[i + 1] for i in range(len(names) - 1))
+        ):
+            return None
+        if time.time() - fetch_time > self.max_age:
+            return None
+        return cached
+
+    def _write(self, module, domain, identity, fetch_time):
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        header = json.dumps(
+            {
+                "version": INDEX_VERSION,
+                "host": identity.get("host"),
+                "user": identity.get("user"),
+                "domain": domain,
+                "time": fetch_time,
+                "names": self._names,
+            }
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".symantec_epm_names")
+        with os.fdopen(fd, "wb") as raw:
+            with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as index_file:
+                # The computers are encoded one at a time in name order, so
+                # the next load needs neither a list of all of them nor a sort
+                index_file.write(to_bytes(header[:-1] + ', "computers": ['))
+                for i, position in enumerate(self._positions):
+                    if i:
+                        index_file.write(b",")
+                    index_file.write(to_bytes(json.dumps(self._records.to_dict(position))))
+                index_file.write(b"]}")
+        module.atomic_move(tmp_path, self.path)
+        # atomic_move applies the default permissions of a new file
+        os.chmod(self.path, 0o600)
+
+    def load(self, module, sclient, domain=None):
+        """Load the computers from the cache when fresh, otherwise fetch all
+        the computers of the domain and cache them.
+
+        :param module: AnsibleModule instance.
+        :param sclient: Sepclient instance.
+        :param domain: Domain of the computers, defaults to the logged-on domain.
+        """
+        identity = sclient.connection_identity()
+        cached = self._read(domain, identity)
+        if cached is not None:
+            # Cached in name order
+            self.age = time.time() - cached["time"]
+            self._names = cached["names"]
+            self._records = CompactRecords(cached.pop("computers"))
+            self._positions = range(len(self._names))
+            return
+        fetch_time = time.time()
+        self._records = CompactRecords(sclient.iter_computers(domain=domain))
+        order = sorted(
+            (to_text(name or "").lower(), position)
+            for position, name in enumerate(self._records.column("computerName"))
+        )
+        self._names = [name for name, dummy in order]
+        self._positions = [position for dummy, position in order]
+        self._write(module, domain, identity, fetch_time)
+        self.fetched = True
+
+    def _range(self, prefix):
+        if not prefix:
+            return 0, len(self._names)
+        # Names starting with prefix sort before prefix with its last character incremented
+        upper = prefix[:-1] + unichr(ord(prefix[-1]) + 1)
+        return bisect_left(self._names, prefix), bisect_left(self._names, upper)
+
+    def search(self, pattern):
+        """Find the computers whose name matches a pattern.
+
+        :param pattern: Computer name, wild card is supported as '*'.
+        :return: List of record positions, in name order.
+        """
+        pattern = to_text(pattern).lower()
+        if "*" not in pattern:
+            return list(
+                self._positions[
+                    bisect_left(self._names, pattern):bisect_right(self._names, pattern)
+                ]
+            )
+        start, end = self._range(pattern.split("*", 1)[0])
+        regex = compile_wildcard(pattern)
+        return [
+            self._positions[i]
+            for i in range(start, end)
+            if regex.match(self._names[i])
+        ]
+
+    def records(self, positions):
+        """Get computers found by search.
+
+        :param positions: List of record positions.
+        :return: List of computer dicts.
+        """
+        return self._records.to_dicts(positions)
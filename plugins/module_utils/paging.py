@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Adaptive page sizing for Symantec EPM paginated endpoints """
+
+# Each page size divides the next one, so that a page boundary at one size is
+# a page boundary at every smaller size. The largest stays below the maximum
+# page size of 1000 accepted by the API.
+PAGE_SIZES = [25, 50, 100, 200, 400, 800]
+
+
+class AdaptivePageSize(object):
+    """
+    Page size adjusted to the observed time and payload size per record so
+    that a page takes about target_time to fetch and stays under max_bytes.
+
+    SEPM pages are addressed by index, page n of size s starting at record
+    (n - 1) * s. The size is only ever changed to one that divides the
+    number of records already fetched, so the next page starts exactly where
+    the previous one ended. Growing therefore goes one step at a time as
+    the offset lines up with the larger size, while shrinking is immediate.
+    """
+
+    def __init__(self, initial=100, sizes=None, target_time=2.0, max_bytes=8 * 1024 * 1024, smoothing=0.5):
+        """
+        Class constructor
+
+        :param initial: Size of the first page, one of sizes.
+        :param sizes: Allowed page sizes, ascending, each dividing the next.
+        :param target_time: Seconds a page should take to fetch.
+        :param max_bytes: Upper bound of the estimated payload of a page.
+        :param smoothing: Weight of the latest page in the per-record estimates.
+        """
+        self.sizes = sizes or PAGE_SIZES
+        self.size = initial
+        self.target_time = target_time
+        self.max_bytes = max_bytes
+        self.smoothing = smoothing
+        self._record_time = None
+        self._record_bytes = None
+
+    def _smooth(self, estimate, value):
+        if estimate is None:
+            return value
+        return self.smoothing * value + (1 - self.smoothing) * estimate
+
+    def resize(self, offset, records, latency, payload_bytes):
+        """Account for the page just fetched and choose the size of the next one.
+
+        :param offset: Number of records fetched so far, a multiple of the current size.
+        :param records: Number of records in the page.
+        :param latency: Seconds the page took to fetch.
+        :param payload_bytes: Estimated size of the page content, None if unknown.
+        :return: Tuple of (page size, page index) of the next page.
+        """
+        if records:
+            self._record_time = self._smooth(self._record_time, float(latency) / records)
+            if payload_bytes is not None:
+                self._record_bytes = self._smooth(
+                    self._record_bytes, float(payload_bytes) / records
+                )
+            ideal = self.target_time / max(self._record_time, 1e-6)
+            if self._record_bytes:
+                ideal = min(ideal, self.max_bytes / self._record_bytes)
+            aligned = [size for size in self.sizes if offset % size == 0]
+            fitting = [size for size in aligned if size <= ideal]
+            if fitting:
+                self.size = max(fitting)
+            elif aligned:
+                self.size = min(aligned)
+        return self.size, offset // self.size + 1
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Estimates of the API cost of module runs """
+
+import json
+import time
+
+from ansible_collections.symantec.epm.plugins.module_utils.paging import (
+    AdaptivePageSize,
+)
+
+
+def empty_plan():
+    """Plan of a run that sends no request."""
+    return dict(requests=0, records=0, bytes=0, command_queue_entries=0, seconds=0.0)
+
+
+def merge_plans(*plans):
+    """Add up the plans of the steps of a run, which run one after the other."""
+    total = empty_plan()
+    for plan in plans:
+        for key in total:
+            total[key] += plan.get(key, 0)
+    total["seconds"] = round(total["seconds"], 3)
+    return total
+
+
+def paged_requests(total):
+    """Number of requests Sepclient.iter_pages sends for total records, when
+    the page size can grow to its maximum."""
+    sizer = AdaptivePageSize()
+    size = sizer.size
+    offset = requests = 0
+    while True:
+        requests += 1
+        offset += size
+        if offset >= total:
+            return requests
+        size, dummy = sizer.resize(offset, size, 0, 0)
+
+
+def _timed(call):
+    start = time.time()
+    result = call()
+    return result, time.time() - start
+
+
+def plan_paged(get_method, **params):
+    """Estimate fetching all the pages of paginated data from a probe of one
+    record. The time is a lower bound, the latency of the probe for every
+    page while larger pages take longer.
+
+    :param get_method: Reference to instance get method e.g. sclient.get_groups etc.
+    :param params: Parameters for get method.
+    :return: Plan dict, None if the probe did not return page metadata.
+    """
+    params.update(pageindex=1, pagesize=1)
+    page, latency = _timed(lambda: get_method(**params))
+    if not isinstance(page, dict) or "totalElements" not in page:
+        return None
+    total = page["totalElements"] or 0
+    record_bytes = len(json.dumps(page["content"][0])) if page.get("content") else 0
+    requests = paged_requests(total)
+    plan = empty_plan()
+    plan.update(
+        requests=requests,
+        records=total,
+        bytes=total * record_bytes,
+        seconds=round(requests * latency, 3),
+    )
+    return plan
+
+
+def plan_requests(sclient, requests, command_queue_entries=0):
+    """Estimate sending requests that cannot be probed, such as commands,
+    from the latency of a version request. The persistent connection sends
+    the requests one at a time, so the time is a lower bound, the latency of
+    the probe for every request.
+
+    :param sclient: Sepclient instance.
+    :param requests: Number of requests.
+    :param command_queue_entries: Number of command queue entries they create.
+    :return: Plan dict.
+    """
+    dummy, latency = _timed(sclient.get_version)
+    plan = empty_plan()
+    plan.update(
+        requests=requests,
+        command_queue_entries=command_queue_entries,
+        seconds=round(requests * latency, 3),
+    )
+    return plan
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Optional cProfile and tracemalloc profiling of modules and the httpapi plugin """
+
+import cProfile
+import functools
+import os
+import time
+
+try:
+    import tracemalloc
+
+    HAS_TRACEMALLOC = True
+except ImportError:
+    # Python 2
+    HAS_TRACEMALLOC = False
+
+# Directory to write profiles to, profiling is off when unset
+PROFILE_DIR_ENV = "SYMANTEC_EPM_PROFILE_DIR"
+
+# Frames kept per traced memory allocation
+TRACEMALLOC_FRAMES = 16
+
+
+class Profiler(object):
+    """
+    CPU profile and memory allocation trace of the code run inside of it,
+    written to directory by dump as <name>-<pid>-<ms>.pstats, readable with
+    the pstats module or snakeviz, and <name>-<pid>-<ms>.tracemalloc, readable
+    with tracemalloc.Snapshot.load.
+
+    It may be entered any number of times, also nested, before being dumped.
+    """
+
+    def __init__(self, directory, name):
+        """
+        Class constructor
+
+        :param directory: Directory the profiles are written to, created if needed.
+        :param name: Name the files start with, e.g. the module name.
+        """
+        self.directory = directory
+        self.name = name
+        self._profile = cProfile.Profile()
+        self._depth = 0
+        if HAS_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def __enter__(self):
+        if not self._depth:
+            self._profile.enable()
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if not self._depth:
+            self._profile.disable()
+        return False
+
+    def dump(self):
+        """Write the profiles collected so far.
+
+        :return: Path of the files written, without extension.
+        """
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        base_path = os.path.join(
+            self.directory,
+            "%s-%d-%d" % (self.name, os.getpid(), int(time.time() * 1000)),
+        )
+        self._profile.dump_stats(base_path + ".pstats")
+        if HAS_TRACEMALLOC and tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().dump(base_path + ".tracemalloc")
+        return base_path
+
+
+def profiled(name):
+    """Decorate the main function of a module to profile it when the
+    SYMANTEC_EPM_PROFILE_DIR environment variable is set.
+
+    :param name: Name of the module.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            directory = os.environ.get(PROFILE_DIR_ENV)
+            if not directory:
+                return func(*args, **kwargs)
+            profiler = Profiler(directory, name)
+            try:
+                with profiler:
+                    return func(*args, **kwargs)
+            finally:
+                # exit_json and fail_json exit through SystemExit, the module
+                # result is already written and must not be spoiled here
+                try:
+                    profiler.dump()
+                except (IOError, OSError):
+                    pass
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Single-flight cache of Symantec EPM GET responses shared between processes """
+
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from ansible.module_utils._text import to_bytes, to_text
+
+
+def default_cache_dir():
+    """Per-user directory for the request cache."""
+    return os.path.join(
+        tempfile.gettempdir(), "symantec_epm_requests-%d" % os.getuid()
+    )
+
+
+class RequestCacheError(Exception):
+    """Raised when the cache directory is not safe to use."""
+
+
+def secure_directory(directory):
+    """Create a directory only accessible by the current user, or check that
+    an existing one is. The default directory has a predictable name in the
+    shared temporary directory, so it may have been created by another user.
+
+    :param directory: Directory path.
+    :raises RequestCacheError: If it is a symlink, not a directory, owned by
+                               another user or accessible by other users.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    if not os.path.isdir(parent):
+        os.makedirs(parent)
+    try:
+        os.mkdir(directory, 0o700)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    st = os.lstat(directory)
+    if stat.S_ISLNK(st.st_mode) or not stat.S_ISDIR(st.st_mode):
+        raise RequestCacheError("%s is not a directory" % directory)
+    if st.st_uid != os.getuid():
+        raise RequestCacheError("%s is owned by another user" % directory)
+    if st.st_mode & 0o077:
+        raise RequestCacheError(
+            "%s is accessible by other users, its mode is %o"
+            % (directory, stat.S_IMODE(st.st_mode))
+        )
+
+
+class SharedRequestCache(object):
+    """
+    Cache of successful GET responses kept for ttl seconds in a directory
+    shared by all connection processes of the controller.
+
+    Fetching a key holds an exclusive lock on it for the duration of the
+    request, so identical requests made at the same time, e.g. by the forks
+    of a play all running groups_info, wait for the first one and get its
+    response instead of each querying the manager (single-flight). Requests
+    following within ttl seconds are served from the cache as well.
+
+    Expired responses are removed when read, and all of them each time a
+    response is stored.
+    """
+
+    def __init__(self, directory, ttl):
+        """
+        Class constructor
+
+        :param directory: Cache directory, created accessible by its owner only.
+        :param ttl: Seconds a response is served from the cache.
+        :raises RequestCacheError: If the directory is not safe to use.
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.stats = dict(hits=0, misses=0)
+        self._lock = threading.Lock()
+        secure_directory(directory)
+
+    @staticmethod
+    def make_key(*parts):
+        """Build the cache key of a request, e.g. from the server, the user and the URL."""
+        return hashlib.sha256(to_bytes(json.dumps(parts))).hexdigest()
+
+    def _load(self, path):
+        # Called with the lock of path held
+        try:
+            if time.time() - os.stat(path).st_mtime >= self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as cache_file:
+                cached = json.loads(to_text(cache_file.read()))
+        except (IOError, OSError, ValueError):
+            return None
+        return cached["status"], cached["response"]
+
+    def _store(self, path, status, response):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".request")
+        with os.fdopen(fd, "wb") as cache_file:
+            cache_file.write(
+                to_bytes(json.dumps({"status": status, "response": response}))
+            )
+        os.rename(tmp_path, path)
+
+    def _prune(self):
+        """Remove the expired responses of all keys, and their lock files.
+
+        Keys locked by another fetch are skipped. A process which opened a
+        lock file before it was removed may still send a request a second
+        time, which only costs that request.
+        """
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name.endswith(".lock"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.stat(path).st_mtime < self.ttl:
+                    continue
+                if name.startswith("."):
+                    # Left behind by a process which died while storing
+                    os.remove(path)
+                    continue
+                with open(path + ".lock", "a") as lock_file:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except (IOError, OSError):
+                        continue
+                    try:
+                        os.remove(path)
+                        os.remove(path + ".lock")
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+            except (IOError, OSError):
+                continue
+
+    def _count(self, counter):
+        with self._lock:
+            self.stats[counter] += 1
+
+    def fetch(self, key, send):
+        """Get a response from the cache, or send the request and cache its
+        response if successful.
+
+        :param key: Cache key built with make_key.
+        :param send: Callable sending the request, returning (status, response).
+        :return: Tuple of (status, response).
+        """
+        path = os.path.join(self.directory, key)
+        with open(path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                cached = self._load(path)
+                if cached is not None:
+                    self._count("hits")
+                    return cached
+                self._count("misses")
+                status, response = send()
+                if 200 <= status < 300:
+                    self._store(path, status, response)
+                    self._prune()
+                return status, response
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -36,12 +36,20 @@ __metaclass__ = type
 """ Process https requests """
 import logging
 import re
+import threading
+import time
 import xml.etree.ElementTree as ET
+from contextlib import contextmanager
 from zipfile import ZipFile
 from io import BytesIO
 from sys import version_info
 from ansible.module_utils.six.moves.urllib.error import HTTPError
 from ansible_collections.symantec.epm.plugins.module_utils.epm import EPMRequest
+from ansible_collections.symantec.epm.plugins.module_utils.flow_control import (
+    AdaptiveLimiter,
+    CallStats,
+    CircuitBreaker,
+)
 from ansible.module_utils.connection import Connection
 import json
 
@@ -51,6 +59,14 @@ ZIP_MAGIC = b"\x50\x4b\x03\x04"
 HASH_LENGTHS = [64, 40, 32]
 
 
+class SepRequestError(Exception):
+    """
+    Raised instead of failing the module when a REST call fails within
+    RequestsSep.raising_errors, so that the caller can report the failure
+    per item.
+    """
+
+
 class RequestsSep(object):
     """
     The class will be used to manage REST calls.
@@ -62,6 +78,110 @@ class RequestsSep(object):
 
         self.module = module
 
+        # Shared by all calls made through this instance
+        self.limiter = AdaptiveLimiter()
+        self.breaker = CircuitBreaker()
+        self.stats = CallStats()
+
+        self._connection = None
+        self._connection_lock = threading.Lock()
+        # Whether failed calls raise, per thread
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        """Connection to the persistent connection process, shared by all
+        threads. It opens a new socket for every request, so concurrent
+        requests do not share any state, only its creation is locked.
+
+        The connection process serves one request at a time, so calls made
+        by several threads are safe but their HTTP requests are sent one
+        after the other.
+        """
+        if self._connection is None:
+            with self._connection_lock:
+                if self._connection is None:
+                    self._connection = Connection(self.module._socket_path)
+        return self._connection
+
+    def connection_identity(self):
+        """Get the manager host and the user of the connection, which the
+        data cached by the modules belongs to.
+
+        :return: Dict with host and user.
+        """
+        return {
+            "host": self.connection.get_option("host"),
+            "user": self.connection.get_option("remote_user"),
+        }
+
+    def flow_control_state(self):
+        """Get the state of the concurrency limiter and the circuit breaker,
+        and the statistics of the calls made.
+
+        :return: Dict suitable for module results.
+        """
+        return {
+            "concurrency": self.limiter.state(),
+            "breaker": self.breaker.state(),
+            "requests": self.stats.state(),
+        }
+
+    @contextmanager
+    def raising_errors(self):
+        """Raise SepRequestError instead of failing the module when a call
+        made by the current thread within the block fails.
+        """
+        previous = getattr(self._local, "raise_errors", False)
+        self._local.raise_errors = True
+        try:
+            yield
+        finally:
+            self._local.raise_errors = previous
+
+    def _fail(self, msg):
+        """Fail the module, or raise SepRequestError within raising_errors.
+
+        :param msg: Error message.
+        """
+        if getattr(self._local, "raise_errors", False):
+            raise SepRequestError(msg)
+        self.module.fail_json(msg=msg, flow_control=self.flow_control_state())
+
+    def _send(self, verb, url, params=None, data=None, headers=None):
+        """Send a request through the persistent connection, within the
+        adaptive concurrency limit and only while the circuit breaker allows it.
+        Server errors (5xx), rate limiting (429) and connection errors count as
+        failures.
+
+        :return: Tuple of response code and response in json format.
+        """
+        self.limiter.acquire()
+        if not self.breaker.allow():
+            self.limiter.release(adjust=False)
+            self._fail(
+                "Circuit breaker is open, Symantec Endpoint Protection Manager is failing or overloaded"
+            )
+        success = False
+        code = response = None
+        start = time.time()
+        try:
+            code, response = self.connection.send_request(
+                verb, url, headers=headers, params=params, data=data
+            )
+            success = not (isinstance(code, int) and (code >= 500 or code == 429))
+            return code, response
+        finally:
+            latency = time.time() - start
+            self.breaker.record(success)
+            self.limiter.release(latency, success)
+            self.stats.record(
+                latency,
+                success and not (isinstance(code, int) and code >= 400),
+                data,
+                response,
+            )
+
     def execute_call(self, verb, url, params=None, data=None, headers=None):
         """Method which initiates the REST API call. Default method is the GET method also supports POST, PATCH,
         PUT, DELETE AND HEAD. Retries are attempted if a Rate limit exception (429) is  detected.
@@ -76,8 +196,7 @@ class RequestsSep(object):
 
         if verb.upper() in ["GET", "HEAD", "PATCH", "POST", "PUT", "DELETE"]:
             try:
-                connection = Connection(self.module._socket_path)
-                code, response = connection.send_request(
+                code, response = self._send(
                     verb.upper(), url, headers=headers, params=params, data=data
                 )
 
@@ -93,8 +212,8 @@ class RequestsSep(object):
                     )
                 ):
                     # We are probably trying to access/delete fingerprint list which doesn't exist.
-                    self.module.fail_json(
-                        msg="Got '410' error, possible attempt to '%s' a fingerprint list which doesn't exist."
+                    self._fail(
+                        "Got '410' error, possible attempt to '%s' a fingerprint list which doesn't exist."
                         % verb
                     )
 
@@ -110,8 +229,8 @@ class RequestsSep(object):
                     )
                 ):
                     # We are probably trying to re-add a hash to fingerprint list which already exists.
-                    self.module.fail_json(
-                        msg="Got '400' error, possible attempt to access a fingerprint list which doesn't exist."
+                    self._fail(
+                        "Got '400' error, possible attempt to access a fingerprint list which doesn't exist."
                     )
                     # Allow error to bubble up to the Resilient function.
                 elif (
@@ -125,15 +244,15 @@ class RequestsSep(object):
                     )
                 ):
                     # We are probably trying to re-add a hash to fingerprint list which already exists.
-                    self.module.fail_json(
-                        msg="Got '409' error, possible attempt to re-add a hash to a fingerprint list."
+                    self._fail(
+                        "Got '409' error, possible attempt to re-add a hash to a fingerprint list."
                     )
                     # Allow error to bubble up to the Resilient function.
                 else:
-                    self.module.fail_json(msg="Uncaught exception: {0}".format(e))
+                    self._fail("Uncaught exception: {0}".format(e))
         else:
-            self.module.fail_json(
-                msg="Unsupported request method '{0}'. This is probably a bug".format(
+            self._fail(
+                "Unsupported request method '{0}'. This is probably a bug".format(
                     verb
                 )
             )
@@ -36,11 +36,21 @@ __metaclass__ = type
 """ Class for Resilient circuits Functions supporting REST API client for Symantec SEP  """
 import re
 import json
+import time
 from textwrap import dedent
 
 from ansible_collections.symantec.epm.plugins.module_utils.requests_sep import (
     RequestsSep,
 )
+from ansible_collections.symantec.epm.plugins.module_utils.group_index import (
+    GroupIndex,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.paging import (
+    AdaptivePageSize,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.matchers import (
+    computer_matcher,
+)
 from ansible.module_utils._text import to_native
 
 HASH_LENGTH_TO_TYPE = {
@@ -50,14 +60,52 @@ HASH_LENGTH_TO_TYPE = {
 }
 
 
+def is_quarantined(computer):
+    """ Find whether a computer record reports the endpoint as quarantined.
+
+    The numeric quarantineStatus is used when the record carries it, otherwise
+    quarantineDesc which is only filled in for quarantined endpoints.
+
+    :param computer: Computer dict as returned by get_computers.
+    :return: True if the endpoint is quarantined.
+    """
+    if computer.get("quarantineStatus") is not None:
+        return str(computer["quarantineStatus"]) not in ["0", ""]
+    return bool(computer.get("quarantineDesc"))
+
+
+def filter_computers(
+    computers, mac=None, status=None, status_details=None, matching_endpoint_ids=None
+):
+    """ Apply the computer filters which are not in the REST call signature, see get_computers.
+
+    :param computers: List of computer dicts.
+    :return: List of the matching computer dicts.
+    """
+    matcher = computer_matcher(mac, status, status_details)
+    if matcher:
+        computers = matcher.filter(computers)
+    if matching_endpoint_ids:
+        computers = [
+            {"uniqueId": c.get("uniqueId"), "computerName": c.get("computerName")}
+            for c in computers
+        ]
+    return computers
+
+
 class Sepclient(object):
     """
     Client class used to expose Symantec SEP Rest API.
     """
 
-    def __init__(self, module):
+    def __init__(self, module, shared_reads=True):
         """
         Class constructor
+
+        :param module: AnsibleModule instance.
+        :param shared_reads: Whether GET responses may be shared by the request
+                             cache of the connection. Disable it in modules
+                             reading the state they are about to change.
         """
         self.base_path = "/sepm/api/v1"
 
@@ -70,6 +118,7 @@ class Sepclient(object):
             "groups": self.base_path + "/groups",
             "clients_online_status": self.base_path + "/stats/client/onlinestatus",
             "scan_endpoints": self.base_path + "/command-queue/eoc",
+            "baseline": self.base_path + "/command-queue/baseline",
             "upload_file": self.base_path + "/command-queue/files",
             "command_status": self.base_path + "/command-queue/{}",
             "file_content": self.base_path + "/command-queue/file/{}/content",
@@ -82,6 +131,39 @@ class Sepclient(object):
         }
         self._req = RequestsSep(module, self.base_path)
         self._headers = {"content-type": "application/json"}
+        if not shared_reads:
+            self._headers["Cache-Control"] = "no-cache"
+
+    def _call_headers(self, extra=None):
+        """Headers of a call, a copy of the client headers so that calls made
+        from several threads never share or modify them.
+
+        :param extra: Dict of additional headers for this call.
+        :return: Headers dict.
+        """
+        headers = dict(self._headers)
+        headers.update(extra or {})
+        return headers
+
+    def flow_control_state(self):
+        """Get the state of the concurrency limiter and circuit breaker shared by all calls of this client.
+
+        :return: Dict suitable for module results.
+        """
+        return self._req.flow_control_state()
+
+    def raising_errors(self):
+        """Context manager raising SepRequestError instead of failing the
+        module when a call made within it fails.
+        """
+        return self._req.raising_errors()
+
+    def connection_identity(self):
+        """Get the manager host and the user of the connection.
+
+        :return: Dict with host and user.
+        """
+        return self._req.connection_identity()
 
     @staticmethod
     def get_hash_type(hash):
@@ -159,7 +241,7 @@ class Sepclient(object):
         """
         url = self._endpoints["version"]
 
-        r = self._req.execute_call("get", url, headers=self._headers)
+        r = self._req.execute_call("get", url, headers=self._call_headers())
 
         return r
 
@@ -172,7 +254,7 @@ class Sepclient(object):
         """
         url = self._endpoints["computers"]
 
-        r = self._req.execute_call("head", url, headers=self._headers)
+        r = self._req.execute_call("head", url, headers=self._call_headers())
 
         return r
 
@@ -183,7 +265,7 @@ class Sepclient(object):
         """
         url = self._endpoints["domains"]
 
-        r = self._req.execute_call("get", url, headers=self._headers)
+        r = self._req.execute_call("get", url, headers=self._call_headers())
 
         return r
 
@@ -200,6 +282,7 @@ class Sepclient(object):
         status=None,
         status_details=None,
         matching_endpoint_ids=None,
+        mac=None,
     ):
         """Get a list of computers. The paramaters are all optional the default is to return results for all computers/
         endpoints.
@@ -212,10 +295,17 @@ class Sepclient(object):
         :param pageindex: The index page that is used for the returned results. The default page index is 1.
         :param pagesize: The number of results to include on each page. The default is 20.
         :param sort: The column by which the results are sorted.
-        :param status: Overall endpoints status. Used by the integration, Not in REST call signature.
-        :param status_details: Endpoints status details. Used by the integration, Not in REST call signature.
-        :param matching_endpoint_ids: Return matching endpoint ids in scan. Used by the integration, Not in REST call signature.
+        :param status: Overall endpoints status, online or offline. Used by the integration, Not in REST call signature.
+        :param status_details: Endpoints status details, dict of computer field to wild card pattern or list of
+                               patterns. Used by the integration, Not in REST call signature.
+        :param matching_endpoint_ids: Return matching endpoint ids in scan, only the uniqueId and computerName of
+                                      the computers are kept. Used by the integration, Not in REST call signature.
+        :param mac: The MAC address of computer. Wild card is supported as '*'.
         :return Result in json format.
+
+        The filters which are not in the REST call signature are applied to the content of the page as it is
+        received, the page metadata is left as returned so that paging carries on, see iter_pages. The MAC address
+        is checked as well, as managers which do not support it return all computers.
         """
         url = self._endpoints["computers"]
         params = {
@@ -227,9 +317,15 @@ class Sepclient(object):
             "pageIndex": pageindex,
             "pageSize": pagesize,
             "sort": sort,
+            "mac": mac,
         }
 
-        r = self._req.execute_call("get", url, headers=self._headers, params=params)
+        r = self._req.execute_call("get", url, headers=self._call_headers(), params=params)
+
+        if isinstance(r, dict) and isinstance(r.get("content"), list):
+            r["content"] = filter_computers(
+                r["content"], mac, status, status_details, matching_endpoint_ids
+            )
 
         return r
 
@@ -240,7 +336,7 @@ class Sepclient(object):
         """
         url = self._endpoints["clients_online_status"]
 
-        r = self._req.execute_call("get", url, headers=self._headers)
+        r = self._req.execute_call("get", url, headers=self._call_headers())
 
         return r
 
@@ -271,16 +367,28 @@ class Sepclient(object):
         params = {
             "domain": domain,
             "fullPathName": fullpathname,
+            "mode": mode,
             "order": order,
             "pageIndex": pageindex,
             "pageSize": pagesize,
             "sort": sort,
         }
 
-        r = self._req.execute_call("get", url, headers=self._headers, params=params)
+        r = self._req.execute_call("get", url, headers=self._call_headers(), params=params)
 
         return r
 
+    def get_group_index(self, domain=None, pagesize=None):
+        """Get an index of all groups of a domain. The groups are fetched once, page by page, in list mode.
+
+        :param domain: The SEP domain name.
+        :param pagesize: The number of groups to fetch per request.
+        :return GroupIndex instance.
+        """
+        return GroupIndex(
+            self.iter_groups(domain=domain, mode="list", pagesize=pagesize)
+        )
+
     def get_fingerprint_list(
         self, fingerprintlist_id=None, domainid=None, fingerprintlist_name=None
     ):
@@ -299,7 +407,7 @@ class Sepclient(object):
 
         params = {"domainId": domainid, "name": fingerprintlist_name}
 
-        r = self._req.execute_call("get", url, headers=self._headers, params=params)
+        r = self._req.execute_call("get", url, headers=self._call_headers(), params=params)
 
         return r
 
@@ -311,7 +419,7 @@ class Sepclient(object):
         """
         url = self._endpoints["fingerprints_list_by_id"].format(fingerprintlist_id)
 
-        r = self._req.execute_call("delete", url, headers=self._headers)
+        r = self._req.execute_call("delete", url, headers=self._call_headers())
 
         return r
 
@@ -354,7 +462,7 @@ class Sepclient(object):
             }
         )
 
-        r = self._req.execute_call("post", url, headers=self._headers, data=payload)
+        r = self._req.execute_call("post", url, headers=self._call_headers(), data=payload)
 
         return r
 
@@ -395,7 +503,7 @@ class Sepclient(object):
                 "data": hash_values,
             }
         )
-        r = self._req.execute_call("post", url, headers=self._headers, data=payload)
+        r = self._req.execute_call("post", url, headers=self._call_headers(), data=payload)
 
         return r
 
@@ -414,7 +522,7 @@ class Sepclient(object):
             {"group_id": groupid, "fingerprint_id": fingerprintlist_id}
         )
 
-        r = self._req.execute_call("put", url, headers=self._headers, data=payload)
+        r = self._req.execute_call("put", url, headers=self._call_headers(), data=payload)
 
         return r
 
@@ -448,7 +556,7 @@ class Sepclient(object):
             "source": source,
         }
 
-        r = self._req.execute_call("post", url, headers=self._headers, params=params)
+        r = self._req.execute_call("post", url, headers=self._call_headers(), params=params)
 
         return r
 
@@ -486,7 +594,7 @@ class Sepclient(object):
             "sort": sort,
         }
 
-        r = self._req.execute_call("get", url, headers=self._headers, params=params)
+        r = self._req.execute_call("get", url, headers=self._call_headers(), params=params)
 
         return r
 
@@ -496,14 +604,13 @@ class Sepclient(object):
         :param file_id: The file ID from which to get detailed information.
         """
         url = self._endpoints["file_content"].format(file_id)
-        headers = self._headers
-        headers.update(
+        headers = self._call_headers(
             {
                 "content-type": "application/json; charset=UTF-8",
                 "Accept-Encoding": "gzip, deflate, compress",
             }
         )
-        r = self._req.execute_call("get", url, headers=headers, stream=True)
+        r = self._req.execute_call("get", url, headers=headers)
 
         return r
 
@@ -525,7 +632,7 @@ class Sepclient(object):
         if undo is not None:
             params.update({"undo": undo})
 
-        r = self._req.execute_call("post", url, headers=self._headers, params=params)
+        r = self._req.execute_call("post", url, headers=self._call_headers(), params=params)
 
         return r
 
@@ -563,11 +670,26 @@ class Sepclient(object):
         )
 
         r = self._req.execute_call(
-            "post", url, headers=self._headers, params=params, data=to_native(payload)
+            "post", url, headers=self._call_headers(), params=params, data=to_native(payload)
         )
 
         return r
 
+    def baseline(self, computer_ids=None, group_ids=None):
+        """Schedule a Baseline application information upload on endpoint(s).
+
+        :param computer_ids: List of computer ids.
+        :param group_ids: List of groups ids.
+        :return Result in json format.
+        """
+        url = self._endpoints["baseline"]
+
+        params = {"computer_ids": computer_ids, "group_ids": group_ids}
+
+        r = self._req.execute_call("post", url, headers=self._call_headers(), params=params)
+
+        return r
+
     def move_endpoint(self, groupid, hardwarekey):
         """ Move an endpoint computer to a group.
 
@@ -575,47 +697,132 @@ class Sepclient(object):
         :param hardwarekey: The computer's hardware key.
         :return Result in json format.
         """
+        return self.move_endpoints([(groupid, hardwarekey)])
+
+    def move_endpoints(self, moves):
+        """ Move several endpoint computers to groups with a single request.
+
+        :param moves: List of (groupid, hardwarekey) tuples.
+        :return Result in json format, one entry per move in the same order.
+        """
         url = self._endpoints["computers"]
 
-        payload = json.dumps([{"group": {"id": groupid}, "hardwareKey": hardwarekey}])
+        payload = json.dumps(
+            [
+                {"group": {"id": groupid}, "hardwareKey": hardwarekey}
+                for groupid, hardwarekey in moves
+            ]
+        )
 
-        r = self._req.execute_call("patch", url, headers=self._headers, data=payload)
+        r = self._req.execute_call("patch", url, headers=self._call_headers(), data=payload)
 
         return r
 
-    def get_paginated_results(self, get_method, **params):
-        """Get multiple pages of paginated data to get cumulmative result.
+    def iter_pages(self, get_method, **params):
+        """Iterate over the pages of paginated data. Paging stops on the last page as reported by the page metadata,
+        so the content of a page may be filtered without ending the iteration.
+
+        Unless pagesize or pageindex is set, the page size adapts to the time and payload size of the pages
+        fetched so far, see AdaptivePageSize.
 
         :param: get_method: Reference to instance get method e.g. self.get_groups etc.
-        :param: params: Parameters for get method .
+        :param: params: Parameters for get method.
 
-        :return Result in json format.
+        :return Generator of results in json format, one per page.
+        """
+        # Set page index to 1 if parameter not set in ther action.
+        page_index = params.get("pageindex") or 1
+        sizer = None
+        if not params.get("pagesize") and page_index == 1:
+            sizer = AdaptivePageSize()
+            params["pagesize"] = sizer.size
+        offset = 0
+        while True:
+            params["pageindex"] = page_index
+            start = time.time()
+            page = get_method(**params)
+            latency = time.time() - start
+            yield page
+            if (
+                not isinstance(page, dict)
+                or "content" not in page
+                or page.get("lastPage")
+                or not page.get("numberOfElements")
+                or page_index >= page.get("totalPages", page_index)
+            ):
+                return
+            if sizer is None:
+                page_index += 1
+                continue
+            if page.get("size", params["pagesize"]) != params["pagesize"]:
+                # Records would be skipped or repeated
+                self._req._fail(
+                    "Page size {0} requested but {1} returned while paging".format(
+                        params["pagesize"], page["size"]
+                    )
+                )
+            offset += params["pagesize"]
+            # The content may be filtered, the metadata counts the records received
+            content = page["content"]
+            records = page["numberOfElements"]
+            params["pagesize"], page_index = sizer.resize(
+                offset,
+                records,
+                latency,
+                len(json.dumps(content[0])) * records if content else None,
+            )
+
+    def iter_paginated_results(self, get_method, **params):
+        """Iterate over the records of paginated data. Only one page is held at a time, so any number of records
+        can be processed with flat memory use.
+
+        :param: get_method: Reference to instance get method e.g. self.get_groups etc.
+        :param: params: Parameters for get method.
 
+        :return Generator of records in json format.
+        """
+        for page in self.iter_pages(get_method, **params):
+            if not isinstance(page, dict) or "content" not in page:
+                self._req._fail(
+                    "Unexpected response while paging: {0}".format(page)
+                )
+            for record in page["content"]:
+                yield record
+
+    def iter_computers(self, **params):
+        """Iterate over computers, see get_computers for the parameters.
+
+        :return Generator of computers in json format.
         """
+        return self.iter_paginated_results(self.get_computers, **params)
 
-        rtn = get_method(**params)
-        if "content" in rtn and rtn["content"]:
-            # Set page index to 1 if parameter not set in ther action.
-            page_index = params.get("pageindex", 1)
-            items_per_page = rtn["size"]
-            total_pages = rtn["totalPages"]
-            max_count = rtn["totalElements"]
+    def iter_groups(self, **params):
+        """Iterate over groups, see get_groups for the parameters.
 
-            # Get initial cumulative item count.
-            current_item_count = rtn["numberOfElements"]
+        :return Generator of groups in json format.
+        """
+        return self.iter_paginated_results(self.get_groups, **params)
+
+    def get_paginated_results(self, get_method, **params):
+        """Get multiple pages of paginated data to get cumulmative result.
 
-            if not current_item_count < items_per_page:
-                while max_count > current_item_count and total_pages > page_index:
+        :param: get_method: Reference to instance get method e.g. self.get_groups etc.
+        :param: params: Parameters for get method .
 
-                    page_index += 1
-                    params["pageindex"] = page_index
+        :return Result in json format.
 
-                    # Re-run request and filter results with new page index set.
-                    rtn_sub = get_method(**params)
-                    rtn["content"].extend(rtn_sub["content"])
-                    for v in ["firstPage", "lastPage", "numberOfElements"]:
-                        rtn[v] = rtn_sub[v]
-                    # Update initial cumulative item count.
-                    current_item_count += rtn["numberOfElements"]
+        """
+        rtn = None
+        for page in self.iter_pages(get_method, **params):
+            if rtn is None:
+                rtn = page
+                continue
+            if not isinstance(page, dict) or "content" not in page:
+                self._req._fail(
+                    "Unexpected response while paging: {0}".format(page)
+                )
+            rtn["content"].extend(page["content"])
+            for v in ["firstPage", "lastPage", "numberOfElements"]:
+                rtn[v] = page[v]
 
         return rtn
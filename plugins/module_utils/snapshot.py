@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+""" Compact snapshots of Symantec EPM inventories for change detection """
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+from ansible.module_utils.six import iteritems
+from ansible.module_utils._text import to_bytes, to_text
+
+SNAPSHOT_VERSION = 1
+
+
+def record_hash(record, ignore_fields=None):
+    """Hash the content of a record.
+
+    :param record: Record dict.
+    :param ignore_fields: Keys left out of the hash, e.g. timestamps that change on every check-in.
+    :return: Hex digest, 32 characters.
+    """
+    if ignore_fields:
+        record = dict((k, v) for k, v in iteritems(record) if k not in ignore_fields)
+    return hashlib.sha256(
+        to_bytes(json.dumps(record, sort_keys=True, separators=(",", ":")))
+    ).hexdigest()[:32]
+
+
+def load_snapshot(path):
+    """Load the record hashes of a snapshot.
+
+    :param path: Snapshot file path.
+    :return: Dict of record key to hash, None if there is no snapshot yet.
+    :raises ValueError: If the file is not a snapshot.
+    """
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rb") as snapshot_file:
+        snapshot = json.loads(to_text(snapshot_file.read()))
+    if not isinstance(snapshot, dict):
+        raise ValueError("not a snapshot")
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    if not isinstance(snapshot.get("hashes"), dict):
+        raise ValueError("malformed snapshot, no hashes")
+    return snapshot["hashes"]
+
+
+def write_snapshot(module, path, hashes):
+    """Write the record hashes of a snapshot and move it into place.
+
+    :param module: AnsibleModule instance.
+    :param path: Snapshot file path.
+    :param hashes: Dict of record key to hash.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=".symantec_epm_snapshot"
+    )
+    with os.fdopen(fd, "wb") as raw:
+        with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as snapshot_file:
+            snapshot_file.write(
+                to_bytes(json.dumps({"version": SNAPSHOT_VERSION, "hashes": hashes}))
+            )
+    module.atomic_move(tmp_path, path)
+
+
+def diff_records(records, previous, key="uniqueId", ignore_fields=None, keep_added=True):
+    """Compare streamed records to the hashes of a previous snapshot in a single
+    pass. Only added and modified records are kept, unchanged ones are dropped
+    as soon as they are hashed.
+
+    :param records: Iterable of record dicts, e.g. Sepclient.iter_computers().
+    :param previous: Dict of record key to hash from load_snapshot.
+    :param key: Record key identifying a record.
+    :param ignore_fields: Keys left out of the hashes.
+    :param keep_added: Keep the added records, otherwise only their keys.
+    :return: Tuple of (added records or keys, modified records, removed keys,
+             unchanged count, hashes for the new snapshot).
+    """
+    previous = dict(previous or {})
+    hashes = {}
+    added = []
+    modified = []
+    unchanged = 0
+    for record in records:
+        record_key = record.get(key)
+        if record_key is None:
+            continue
+        digest = record_hash(record, ignore_fields)
+        hashes[record_key] = digest
+        old_digest = previous.pop(record_key, None)
+        if old_digest is None:
+            added.append(record if keep_added else record_key)
+        elif old_digest != digest:
+            modified.append(record)
+        else:
+            unchanged += 1
+    return added, modified, sorted(previous), unchanged, hashes
@@ -32,18 +32,45 @@ options:
      - Comma delimited list of groups to run the scan against
     required: false
     type: str
+  journal:
+    description:
+     - Path of a local journal of the commands submitted by this collection.
+     - When set, the journal is checked before a new command is scheduled. If
+       an identical command for the same targets was recorded less than
+       C(journal_max_age) seconds ago and its command status shows it is still
+       running, that command is reused instead of scheduling a duplicate.
+     - The journal stays locked from the check until the new command is
+       recorded, tasks using the same journal run this step one at a time.
+     - Use a separate journal per Endpoint Protection Manager.
+    required: false
+    type: path
+  journal_max_age:
+    description:
+     - Seconds after which a journal entry is no longer reused.
+    required: false
+    type: int
+    default: 3600
 notes:
   - Module requires either C(computers) or C(groups) be provided, or both.
   - Because of the means of interaction with Symantec Endpoint Protection, this
     module is not idempotent. Every time this module is called via a task in a
-    module a scan will be scheduled on the Endpoint Protection Manager.
+    module a scan will be scheduled on the Endpoint Protection Manager, unless
+    an identical command is still in flight according to C(journal).
 
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+  - symantec.epm.plan
 author: "Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>"
 """
 
 
 # FIXME - provide correct example here
 RETURN = """
+plan:
+    description: Estimated cost of the run, nothing is changed. See the
+                 symantec.epm.plan documentation fragment
+    returned: in check mode
+    type: dict
 sepm_data:
     description: Data returned from Symantec Endpoint Protection Manager
     returned: always
@@ -63,6 +90,16 @@ command_ids:
     description: List of all commandIDs spawned from this job
     returned: always
     type: list
+reused:
+    description: Whether an in-flight command from C(journal) was reused
+                 instead of scheduling a new one
+    returned: always
+    type: bool
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
 """
 
 EXAMPLES = """
@@ -80,42 +117,78 @@ EXAMPLES = """
 
 from ansible.module_utils.basic import AnsibleModule
 
-from ansible.module_utils.six.moves.urllib.parse import urlencode
-from ansible_collections.symantec.epm.plugins.module_utils.epm import EPMRequest
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.command_journal import (
+    CommandJournal,
+    find_in_flight,
+    split_ids,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.planner import plan_requests
 
 
+@profiled("baseline")
 def main():
 
     argspec = dict(
         computers=dict(required=False, type="str"),
         groups=dict(required=False, type="str"),
+        journal=dict(required=False, type="path"),
+        journal_max_age=dict(required=False, type="int", default=3600),
     )
 
     module = AnsibleModule(
         argument_spec=argspec,
         required_one_of=[["computers", "groups"]],
-        supports_check_mode=False,
+        supports_check_mode=True,
     )
 
-    epm_request = EPMRequest(module, headers={"Content-Type": "application/json"})
-
-    query_data = {}
-
-    if module.params["computers"]:
-        query_data["computer_ids"] = module.params["computers"]
-
-    if module.params["groups"]:
-        query_data["group_ids"] = module.params["groups"]
+    sclient = Sepclient(module)
+
+    if module.params["journal"]:
+        journal = CommandJournal(module.params["journal"], module.params["journal_max_age"])
+        # Held until the new command is recorded, so that a task running at
+        # the same time finds it instead of submitting it again
+        journal.acquire()
+        journal_key = CommandJournal.make_key(
+            "baseline",
+            computer_ids=module.params["computers"],
+            group_ids=module.params["groups"],
+        )
+        entry = find_in_flight(journal, sclient, journal_key)
+        if entry is not None:
+            module.exit_json(
+                sepm_data=entry["sepm_data"],
+                command_ids=entry["command_ids"],
+                reused=True,
+                changed=False,
+                flow_control=sclient.flow_control_state(),
+            )
+
+    if module.check_mode:
+        module.exit_json(
+            sepm_data={},
+            command_ids=[],
+            reused=False,
+            plan=plan_requests(
+                sclient,
+                1,
+                command_queue_entries=len(split_ids(module.params["computers"]))
+                + len(split_ids(module.params["groups"])),
+            ),
+            changed=True,
+            flow_control=sclient.flow_control_state(),
+        )
 
-    sepm_data = epm_request.post_by_path(
-        "sepm/api/v1/command-queue/baseline?{0}".format(urlencode(query_data)),
-        data=False,
+    sepm_data = sclient.baseline(
+        computer_ids=module.params["computers"], group_ids=module.params["groups"],
     )
 
     if "errorCode" in sepm_data:
         module.fail_json(
             msg="Failed to schedule Baseline Application Data Upload",
             sepm_data=sepm_data,
+            flow_control=sclient.flow_control_state(),
         )
     command_ids = []
     if 'commandID_computer' in sepm_data:
@@ -123,7 +196,25 @@ def main():
     if 'commandID_group' in sepm_data:
         command_ids.append(sepm_data['commandID_group'])
 
-    module.exit_json(sepm_data=sepm_data, command_ids=command_ids, changed=True)
+    if module.params["journal"]:
+        journal.record(
+            journal_key,
+            "baseline",
+            module.params["computers"],
+            module.params["groups"],
+            None,
+            command_ids,
+            sepm_data,
+        )
+        journal.release()
+
+    module.exit_json(
+        sepm_data=sepm_data,
+        command_ids=command_ids,
+        reused=False,
+        changed=True,
+        flow_control=sclient.flow_control_state(),
+    )
 
 
 if __name__ == "__main__":
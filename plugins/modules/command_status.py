@@ -26,6 +26,8 @@ options:
     required: true
     type: str
 
+extends_documentation_fragment:
+  - symantec.epm.flow_control
 author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>"
 """
 
@@ -42,6 +44,11 @@ computers:
     description: Each list entry contains a dictionary that represents
                  a computer to Symantec Endpoint Security
                  https://apidocs.symantec.com/home/saep#_computer
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
 """
 
 EXAMPLES = """
@@ -78,12 +85,14 @@ from ansible.module_utils._text import to_text
 from ansible.module_utils.urls import Request
 from ansible.module_utils.six.moves.urllib.parse import urlencode
 from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
 from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
 
 import copy
 import json
 
 
+@profiled("command_status")
 def main():
 
     argspec = dict(
@@ -96,7 +105,11 @@ def main():
 
     sepm_data = sclient.get_command_status(commandid=module.params['id'])
 
-    module.exit_json(sepm_data=sepm_data, changed=False)
+    module.exit_json(
+        sepm_data=sepm_data,
+        changed=False,
+        flow_control=sclient.flow_control_state(),
+    )
     # module.fail_json(msg="Unable to query Computers data", sepm_data=sepm_data)
 
 
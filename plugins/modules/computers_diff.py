@@ -0,0 +1,215 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+DOCUMENTATION = """
+---
+module: computers_diff
+short_description: Report Symantec Endpoint Protection Manager computers changed since the last run
+description:
+  - Compare the Symantec Endpoint Protection Manager computers to a snapshot
+    taken by a previous run and return only the computers added, modified or
+    removed since then.
+  - The snapshot only holds a content hash per computer ID, computers are
+    compared page by page as they arrive and unchanged computers are not kept.
+version_added: "2.9"
+options:
+  name:
+    description:
+     - The host name of computer. Wild card is supported as '*'.
+    required: false
+    type: str
+  domain:
+    description:
+     - The domain from which to get computer information.
+    required: false
+    type: str
+  snapshot:
+    description:
+     - Path of the local snapshot file, a gzip compressed JSON document.
+     - When the file does not exist yet every computer is reported as added,
+       see I(baseline_records).
+     - Its directory must exist.
+    required: true
+    type: path
+  ignore_fields:
+    description:
+     - Computer fields left out of the comparison, such as fields updated on
+       every check-in of the agent.
+    required: false
+    type: list
+    elements: str
+    default: []
+  update_snapshot:
+    description:
+     - Replace the snapshot with the current state of the computers so that
+       the next run reports changes from now on.
+     - The snapshot is never written in check mode.
+    required: false
+    type: bool
+    default: true
+  baseline_records:
+    description:
+     - Return the full computers in I(added) on the first run, when there is
+       no snapshot yet.
+     - By default only their unique IDs are returned, in I(added_ids), as
+       every computer of the fleet is new.
+    required: false
+    type: bool
+    default: false
+notes:
+  - Use the same I(name), I(domain) and I(ignore_fields) on every run with a
+    given snapshot, computers outside of the filter are reported as removed.
+
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>
+"""
+
+
+RETURN = """
+added:
+    description: Computers not in the snapshot. Empty on the first run
+                 unless I(baseline_records) is set
+    returned: always
+    type: list
+    elements: dict
+added_ids:
+    description: Unique IDs of the computers not in the snapshot
+    returned: always
+    type: list
+    elements: str
+baseline:
+    description: Whether there was no snapshot yet, all the computers are
+                 then added
+    returned: always
+    type: bool
+modified:
+    description: Computers whose content differs from the snapshot
+    returned: always
+    type: list
+    elements: dict
+removed:
+    description: Unique IDs of the computers in the snapshot that no longer exist
+    returned: always
+    type: list
+    elements: str
+unchanged:
+    description: Number of computers identical to the snapshot
+    returned: always
+    type: int
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
+"""
+
+EXAMPLES = """
+- name: get the computers changed since the last run
+  symantec.epm.computers_diff:
+    snapshot: /var/lib/reports/computers.snapshot.gz
+    ignore_fields:
+      - lastUpdateTime
+      - lastScanTime
+  register: computers_diff_out
+
+- name: display the names of the new computers
+  debug:
+    msg: "{{ computers_diff_out['added'] | map(attribute='computerName') | list }}"
+"""
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.snapshot import (
+    diff_records,
+    load_snapshot,
+    write_snapshot,
+)
+
+
+@profiled("computers_diff")
+def main():
+
+    argspec = dict(
+        name=dict(required=False, type="str"),
+        domain=dict(required=False, type="str"),
+        snapshot=dict(required=True, type="path"),
+        ignore_fields=dict(required=False, type="list", elements="str", default=[]),
+        update_snapshot=dict(required=False, type="bool", default=True),
+        baseline_records=dict(required=False, type="bool", default=False),
+    )
+
+    module = AnsibleModule(argument_spec=argspec, supports_check_mode=True)
+
+    sclient = Sepclient(module)
+
+    # Checked before fetching the computers rather than when writing the snapshot
+    directory = os.path.dirname(module.params["snapshot"]) or "."
+    if module.params["update_snapshot"] and not module.check_mode:
+        if not os.path.isdir(directory):
+            module.fail_json(
+                msg="Snapshot directory {0} does not exist".format(directory),
+                flow_control=sclient.flow_control_state(),
+            )
+        if not os.access(directory, os.W_OK):
+            module.fail_json(
+                msg="Snapshot directory {0} is not writable".format(directory),
+                flow_control=sclient.flow_control_state(),
+            )
+
+    try:
+        previous = load_snapshot(module.params["snapshot"])
+    except (IOError, OSError, ValueError) as e:
+        module.fail_json(
+            msg="Unable to read snapshot %s: %s" % (module.params["snapshot"], e),
+            flow_control=sclient.flow_control_state(),
+        )
+
+    keep_added = previous is not None or module.params["baseline_records"]
+    added, modified, removed, unchanged, hashes = diff_records(
+        sclient.iter_computers(
+            computername=module.params["name"], domain=module.params["domain"],
+        ),
+        previous,
+        ignore_fields=set(module.params["ignore_fields"]),
+        keep_added=keep_added,
+    )
+    if keep_added:
+        added_ids = [computer.get("uniqueId") for computer in added]
+    else:
+        added_ids, added = added, []
+
+    changed = bool(previous is None or added or modified or removed)
+    if changed and module.params["update_snapshot"] and not module.check_mode:
+        write_snapshot(module, module.params["snapshot"], hashes)
+
+    module.exit_json(
+        added=added,
+        added_ids=added_ids,
+        baseline=previous is None,
+        modified=modified,
+        removed=removed,
+        unchanged=unchanged,
+        changed=changed,
+        flow_control=sclient.flow_control_state(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+DOCUMENTATION = """
+---
+module: computers_export
+short_description: Export Symantec Endpoint Protection Manager computers to a file
+description:
+  - Stream Symantec Endpoint Protection Manager computers straight to a local
+    file as newline delimited JSON or CSV, optionally gzip compressed.
+  - Rows are written page by page as they arrive, only the file path, the
+    number of rows and the checksum are returned.
+version_added: "2.9"
+options:
+  name:
+    description:
+     - The host name of computer. Wild card is supported as '*'.
+    required: false
+    type: str
+  domain:
+    description:
+     - The domain from which to get computer information.
+    required: false
+    type: str
+
+extends_documentation_fragment:
+  - symantec.epm.export
+  - symantec.epm.flow_control
+author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>
+"""
+
+
+RETURN = """
+path:
+    description: Path of the file written
+    returned: always
+    type: str
+rows:
+    description: Number of records written
+    returned: always
+    type: int
+checksum:
+    description: SHA256 checksum of the file
+    returned: always
+    type: str
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
+"""
+
+EXAMPLES = """
+- name: export all computers as gzip compressed NDJSON
+  symantec.epm.computers_export:
+    path: /var/lib/reports/computers.ndjson.gz
+    compress: true
+  register: computers_export_out
+
+- name: export the name, ID and group of all computers as CSV
+  symantec.epm.computers_export:
+    path: /var/lib/reports/computers.csv
+    format: csv
+    fields:
+      - computerName
+      - uniqueId
+      - group
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.export import (
+    EXPORT_ARGSPEC,
+    export_records,
+)
+
+
+@profiled("computers_export")
+def main():
+
+    argspec = dict(
+        name=dict(required=False, type="str"),
+        domain=dict(required=False, type="str"),
+    )
+    argspec.update(EXPORT_ARGSPEC)
+
+    module = AnsibleModule(argument_spec=argspec, supports_check_mode=False)
+
+    sclient = Sepclient(module)
+
+    result = export_records(
+        module,
+        sclient,
+        sclient.iter_computers(
+            computername=module.params["name"], domain=module.params["domain"],
+        ),
+    )
+
+    module.exit_json(flow_control=sclient.flow_control_state(), **result)
+
+
+if __name__ == "__main__":
+    main()
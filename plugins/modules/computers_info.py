@@ -25,6 +25,30 @@ options:
      - The host name of computer. Wild card is supported as '*'.
     required: false
     type: str
+  names:
+    description:
+     - List of host names of computers to get in one task, wild card is
+       supported as '*'. Names are compared case insensitively.
+     - Names matching no computer are returned in I(unmatched_names).
+    required: false
+    type: list
+    elements: str
+  names_strategy:
+    description:
+     - How I(names) are resolved. C(query) sends a query per name, one
+       after the other. C(fetch_all) fetches all the computers matching the
+       other options and keeps those matching a name, looked up in a hash
+       set.
+     - C(auto) picks C(query) for one or two names, otherwise probes the
+       number of computers and picks the strategy that sends fewer
+       requests, a query per name or a request per page of computers.
+    required: false
+    type: str
+    choices:
+     - auto
+     - query
+     - fetch_all
+    default: auto
   domain:
     description:
      - The domain from which to get computer information.
@@ -70,15 +94,108 @@ options:
      - WinXPProf64
     required: false
     type: list
+  status:
+    description:
+     - Only return the computers with this online status.
+     - The API has no such filter, the computers are filtered as they are
+       received, like for I(status_details).
+    required: false
+    type: str
+    choices:
+     - online
+     - offline
+  status_details:
+    description:
+     - Only return the computers whose fields match these patterns, e.g.
+       C(infected), C(ipAddresses) or C(agentVersion). Fields are matched
+       case insensitively against a pattern or a list of patterns, wild card
+       is supported as '*', list fields match if any of their values match.
+     - Patterns are strings, numbers or booleans, matched as text, e.g. the
+       pattern 1 of C(infected) matches the infected computers.
+     - The API has no such filter, each page of computers is filtered as it
+       is received so the computers that do not match are never kept.
+    required: false
+    type: dict
+  ids_only:
+    description:
+     - Only keep the uniqueId and computerName of the computers returned,
+       e.g. when only I(id_list) is used.
+    required: false
+    type: bool
+    default: false
+  name_index:
+    description:
+     - Path of a local file caching all the computers of the domain, sorted
+       by name. Computers are then found in the cache instead of querying
+       the manager, names and prefixes are looked up by binary search.
+     - The computers are fetched again, with one paged query, once the
+       cache is older than I(name_index_max_age), was built for another
+       manager host, user or domain, or cannot be read.
+     - The file is only readable by its owner.
+     - Cannot be used with I(os), which the cache cannot evaluate.
+    required: false
+    type: path
+  name_index_max_age:
+    description:
+     - Seconds the computers cached in I(name_index) are used before they
+       are fetched again.
+    required: false
+    type: int
+    default: 300
+  plan:
+    description:
+     - Only probe the first record to return an estimate of the number of
+       requests, the size of the data and the time needed to get it, instead
+       of the data.
+    required: false
+    type: bool
+    default: false
 notes:
+  - I(name), I(domain), I(mac) and I(os) are passed to the API, I(mac) is
+    checked again on the computers received since managers which do not
+    support it return all computers.
+  - The estimate of I(plan) does not account for I(status) and
+    I(status_details), which are applied to the records received.
   - This module returns a dict of group data and is meant to be registered to a
     variable in a Play for conditional use or inspection/debug purposes.
 
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+  - symantec.epm.plan
 author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>"
 """
 
 
 RETURN = """
+plan:
+    description: Estimated cost of getting the data, instead of the data. See the
+                 symantec.epm.plan documentation fragment
+    returned: when C(plan) is set
+    type: dict
+name_index:
+    description: State of the computer name cache
+    returned: when C(name_index) is set
+    type: complex
+    contains:
+        fetched:
+            description: Whether the computers were fetched again
+            type: bool
+        age:
+            description: Age of the cached computers, in seconds
+            type: float
+        computers:
+            description: Number of computers in the cache
+            type: int
+unmatched_names:
+    description: The names and patterns of I(names) matching no computer
+    returned: when C(names) is set
+    type: list
+    elements: str
+names_strategy:
+    description: The strategy used to resolve I(names), C(query),
+                 C(fetch_all) or C(name_index)
+    returned: when C(names) is set
+    type: str
 id_list:
     type: str
     returned: always
@@ -90,6 +207,11 @@ computers:
     description: Each list entry contains a dictionary that represents
                  a computer to Symantec Endpoint Security
                  https://apidocs.symantec.com/home/saep#_computer
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
 """
 
 EXAMPLES = """
@@ -116,20 +238,110 @@ EXAMPLES = """
 # Display only the id_list from values returned
 - debug:
     var: computers_info_out['id_list']
+
+- name: get the computers of a list of host names
+  symantec.epm.computers_info:
+    names: "{{ ticket_hostnames }}"
+  register: computers_info_out
+
+- name: display the host names not found
+  debug:
+    var: computers_info_out['unmatched_names']
+
+- name: find computers by name prefix, from a local cache refreshed every 10 minutes
+  symantec.epm.computers_info:
+    name: "web-*"
+    name_index: ~/.cache/symantec_epm/computers.json.gz
+    name_index_max_age: 600
+  register: computers_info_out
 """
 
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_text
 
 from ansible.module_utils.urls import Request
 from ansible.module_utils.six.moves.urllib.parse import urlencode
 from ansible.module_utils.six.moves.urllib.error import HTTPError
-from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import (
+    Sepclient,
+    filter_computers,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.name_index import (
+    ComputerNameIndex,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.matchers import (
+    NameSet,
+    pattern_list,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    call_each,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.planner import plan_paged
 
 import copy
 import json
 
 
+def choose_names_strategy(sclient, names, query):
+    """Pick how to resolve a list of names from the number of requests each
+    strategy sends: at least one query per name, or one request per page
+    with a fetch of all the computers. The connection process sends them
+    one after the other, so the time follows the number of requests.
+
+    :param sclient: Sepclient instance.
+    :param names: List of names.
+    :param query: Parameters of get_computers other than the name.
+    :return: query or fetch_all.
+    """
+    # The probe and at least one page are already as many requests as two names
+    if len(names) <= 2:
+        return "query"
+    plan = plan_paged(sclient.get_computers, **query)
+    if plan is None:
+        return "query"
+    return "fetch_all" if plan["requests"] < len(names) else "query"
+
+
+def query_names(sclient, names, query):
+    """Query the computers of each name.
+
+    :param sclient: Sepclient instance.
+    :param names: List of names.
+    :param query: Parameters of get_computers other than the name.
+    :return: Tuple of (list of computers, dict of failed name to error).
+    """
+    # The errors of a name are reported, the other names are still queried
+    computers = []
+    failed_names = {}
+    for name, records, error in call_each(
+        sclient,
+        lambda name: list(sclient.iter_computers(computername=name, **query)),
+        names,
+    ):
+        if error is not None:
+            failed_names[name] = str(error)
+        else:
+            computers.extend(records)
+    return computers, failed_names
+
+
+def unique_computers(computers):
+    """Drop the computers matched by more than one name.
+
+    :param computers: Iterable of computer dicts.
+    :return: Generator of computer dicts.
+    """
+    seen = set()
+    for computer in computers:
+        unique_id = computer.get("uniqueId")
+        if unique_id is None or unique_id not in seen:
+            seen.add(unique_id)
+            yield computer
+
+
+@profiled("computers_info")
 def main():
 
     argspec = dict(
@@ -171,28 +383,141 @@ def main():
                 "WinXPProf64",
             ],
         ),
+        status=dict(required=False, type="str", choices=["online", "offline"]),
+        status_details=dict(required=False, type="dict"),
+        ids_only=dict(required=False, type="bool", default=False),
+        names=dict(required=False, type="list", elements="str"),
+        names_strategy=dict(
+            required=False,
+            type="str",
+            choices=["auto", "query", "fetch_all"],
+            default="auto",
+        ),
+        name_index=dict(required=False, type="path"),
+        name_index_max_age=dict(required=False, type="int", default=300),
+        plan=dict(required=False, type="bool", default=False),
     )
 
-    module = AnsibleModule(argument_spec=argspec, supports_check_mode=True)
+    module = AnsibleModule(
+        argument_spec=argspec,
+        mutually_exclusive=[("name", "names"), ("name_index", "os")],
+        supports_check_mode=True,
+    )
 
     sclient = Sepclient(module)
 
-    client_response = sclient.get_computers(
+    for field, patterns in (module.params["status_details"] or {}).items():
+        try:
+            pattern_list(patterns)
+        except TypeError as e:
+            module.fail_json(
+                msg="Invalid status_details for {0}: {1}".format(field, e),
+                flow_control=sclient.flow_control_state(),
+            )
+
+    query = dict(
         computername=module.params["name"],
         domain=module.params["domain"],
+        mac=module.params["mac"],
         os=",".join(module.params["os"]) if module.params["os"] else module.params["os"],
+        status=module.params["status"],
+        status_details=module.params["status_details"],
+        matching_endpoint_ids=module.params["ids_only"],
     )
 
-    if "content" in client_response:
-        list_of_computers = client_response["content"]
-        id_list = ""
-        try:
-            id_list += ",".join([comp["uniqueId"] for comp in list_of_computers])
-        except KeyError:
-            module.warn("Unable to compile id_list")
-        module.exit_json(computers=list_of_computers, id_list=id_list, changed=False)
+    if module.params["plan"]:
+        plan = plan_paged(sclient.get_computers, **query)
+        if plan is None:
+            module.fail_json(
+                msg="Unable to query Computers data",
+                flow_control=sclient.flow_control_state(),
+            )
+        module.exit_json(
+            plan=plan, changed=False, flow_control=sclient.flow_control_state()
+        )
+
+    names = []
+    for name in module.params["names"] or []:
+        if name not in names:
+            names.append(name)
+    extra_results = {}
+    if module.params["name_index"]:
+        index = ComputerNameIndex(
+            module.params["name_index"], module.params["name_index_max_age"]
+        )
+        index.load(module, sclient, module.params["domain"])
+        positions = []
+        seen = set()
+        for pattern in names or [module.params["name"] or "*"]:
+            for position in index.search(pattern):
+                if position not in seen:
+                    seen.add(position)
+                    positions.append(position)
+        computers = filter_computers(
+            index.records(positions),
+            mac=module.params["mac"],
+            status=module.params["status"],
+            status_details=module.params["status_details"],
+            matching_endpoint_ids=module.params["ids_only"],
+        )
+        extra_results["name_index"] = dict(
+            fetched=index.fetched, age=round(index.age, 3), computers=len(index)
+        )
+        extra_results["names_strategy"] = "name_index"
+    elif names:
+        query.pop("computername")
+        strategy = module.params["names_strategy"]
+        if strategy == "auto":
+            strategy = choose_names_strategy(sclient, names, query)
+        extra_results["names_strategy"] = strategy
+        if strategy == "query":
+            records, failed_names = query_names(sclient, names, query)
+            if failed_names:
+                module.fail_json(
+                    msg="Unable to query Computers data of {0} name(s)".format(
+                        len(failed_names)
+                    ),
+                    failed_names=failed_names,
+                    flow_control=sclient.flow_control_state(),
+                )
+        else:
+            name_set = NameSet(names)
+            records = (
+                computer
+                for computer in sclient.iter_computers(**query)
+                if name_set.match(computer.get("computerName"))
+            )
+        computers = list(unique_computers(records))
+    else:
+        # All the computers are output, so the pages are appended as they are
+        computers = []
+        for client_response in sclient.iter_pages(sclient.get_computers, **query):
+            if "content" not in client_response:
+                module.fail_json(
+                    msg="Unable to query Computers data",
+                    sepm_data=client_response,
+                    flow_control=sclient.flow_control_state(),
+                )
+            computers.extend(client_response["content"])
+
+    if names:
+        extra_results["unmatched_names"] = NameSet(names).unmatched(
+            computer.get("computerName") for computer in computers
+        )
+
+    id_list = ""
+    unique_ids = [computer.get("uniqueId") for computer in computers]
+    if None in unique_ids:
+        module.warn("Unable to compile id_list")
     else:
-        module.fail_json(msg="Unable to query Computers data", sepm_data=client_response)
+        id_list += ",".join(unique_ids)
+    module.exit_json(
+        computers=computers,
+        id_list=id_list,
+        changed=False,
+        flow_control=sclient.flow_control_state(),
+        **extra_results
+    )
 
 
 if __name__ == "__main__":
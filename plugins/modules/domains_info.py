@@ -33,6 +33,8 @@ notes:
     registered to a variable in a Play for conditional use or inspection/debug
     purposes.
 
+extends_documentation_fragment:
+  - symantec.epm.flow_control
 author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>"
 """
 
@@ -49,6 +51,11 @@ domains:
     description: Each list entry contains a dictionary that represents
                  a domain to Symantec Endpoint Security
                  https://apidocs.symantec.com/home/saep#_domainaddeditto
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
 """
 
 EXAMPLES = """
@@ -69,12 +76,14 @@ from ansible.module_utils._text import to_text
 from ansible.module_utils.urls import Request
 from ansible.module_utils.six.moves.urllib.parse import quote
 from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
 from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
 
 import copy
 import json
 
 
+@profiled("domains_info")
 def main():
 
     argspec = dict(domain=dict(required=False, type="str"),)
@@ -91,7 +100,12 @@ def main():
         id_list += ",".join([domain["id"] for domain in list_of_domains])
     except KeyError:
         module.warn("Unable to compile id_list")
-    module.exit_json(domains=list_of_domains, id_list=id_list, changed=False)
+    module.exit_json(
+        domains=list_of_domains,
+        id_list=id_list,
+        changed=False,
+        flow_control=sclient.flow_control_state(),
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+DOCUMENTATION = """
+---
+module: epm_facts
+short_description: Gather facts about a Symantec Endpoint Protection Manager
+description:
+  - Gather the version, domains, groups, client online status and optionally
+    the computers of a Symantec Endpoint Protection Manager in one task.
+  - The subsets are queried one after the other, as the persistent
+    connection serves the requests of a task one at a time. They are
+    returned as facts, so they can be cached with the fact cache.
+version_added: "2.9"
+options:
+  gather_subset:
+    description:
+      - The subsets of facts to gather.
+      - C(all) gathers every subset but C(computers), which can be large and
+        is only gathered when listed.
+    required: false
+    type: list
+    elements: str
+    choices:
+      - all
+      - version
+      - domains
+      - groups
+      - online_status
+      - computers
+    default:
+      - all
+
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>
+"""
+
+
+RETURN = """
+ansible_facts:
+    description: Facts of the Symantec Endpoint Protection Manager
+    returned: always
+    type: complex
+    contains:
+        epm_gather_subset:
+            description: The subsets gathered
+            type: list
+            elements: str
+        epm_version:
+            description: Version of the manager
+            returned: when version is gathered
+            type: dict
+        epm_domains:
+            description: Domains, https://apidocs.symantec.com/home/saep#_domainaddeditto
+            returned: when domains is gathered
+            type: list
+            elements: dict
+        epm_groups:
+            description: Groups, https://apidocs.symantec.com/home/saep#_groupdto
+            returned: when groups is gathered
+            type: list
+            elements: dict
+        epm_online_status:
+            description: List and count of the online and offline clients
+            returned: when online_status is gathered
+            type: dict
+        epm_computers:
+            description: Computers, https://apidocs.symantec.com/home/saep#_computer
+            returned: when computers is gathered
+            type: list
+            elements: dict
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
+"""
+
+EXAMPLES = """
+- name: gather the version, domains, groups and client online status
+  symantec.epm.epm_facts:
+
+- name: display the version
+  debug:
+    var: epm_version
+
+- name: gather the groups and the computers only
+  symantec.epm.epm_facts:
+    gather_subset:
+      - groups
+      - computers
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    call_each,
+)
+
+# Subset name to the function gathering it
+GATHERERS = {
+    "version": lambda sclient: sclient.get_version(),
+    "domains": lambda sclient: sclient.get_domains(),
+    "groups": lambda sclient: list(sclient.iter_groups(mode="list")),
+    "online_status": lambda sclient: sclient.get_clients_online_status(),
+    "computers": lambda sclient: list(sclient.iter_computers()),
+}
+
+DEFAULT_SUBSETS = ["version", "domains", "groups", "online_status"]
+
+
+@profiled("epm_facts")
+def main():
+
+    argspec = dict(
+        gather_subset=dict(
+            required=False,
+            type="list",
+            elements="str",
+            choices=["all"] + sorted(GATHERERS),
+            default=["all"],
+        ),
+    )
+
+    module = AnsibleModule(argument_spec=argspec, supports_check_mode=True)
+
+    sclient = Sepclient(module)
+
+    subsets = set(module.params["gather_subset"])
+    if "all" in subsets:
+        subsets.remove("all")
+        subsets.update(DEFAULT_SUBSETS)
+    subsets = sorted(subsets)
+
+    facts = dict(epm_gather_subset=subsets)
+    failed_subsets = {}
+    # The errors of a subset are reported, the other subsets are still gathered
+    for subset, result, error in call_each(
+        sclient, lambda subset: GATHERERS[subset](sclient), subsets
+    ):
+        if error is not None:
+            failed_subsets[subset] = str(error)
+        elif isinstance(result, dict) and "errorCode" in result:
+            failed_subsets[subset] = result.get("errorMessage", result["errorCode"])
+        else:
+            facts["epm_" + subset] = result
+
+    if failed_subsets:
+        module.fail_json(
+            msg="Unable to gather {0}".format(", ".join(sorted(failed_subsets))),
+            failed_subsets=failed_subsets,
+            flow_control=sclient.flow_control_state(),
+        )
+
+    module.exit_json(
+        ansible_facts=facts, changed=False, flow_control=sclient.flow_control_state(),
+    )
+
+
+if __name__ == "__main__":
+    main()
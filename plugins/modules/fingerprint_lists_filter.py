@@ -0,0 +1,177 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+DOCUMENTATION = """
+---
+module: fingerprint_lists_filter
+short_description: Find which hashes are already in Symantec Endpoint Protection Manager fingerprint lists
+description:
+  - Check a batch of hashes against Symantec Endpoint Protection Manager
+    fingerprint lists without a request per hash, e.g. to only add the new
+    hashes of a set of indicators of compromise to a list.
+  - The lists are fetched once and optionally cached locally, hashes are then
+    looked up in a local index.
+version_added: "2.9"
+options:
+  lists:
+    description:
+     - Names of the fingerprint lists to check the hashes against.
+    required: true
+    type: list
+    elements: str
+  domain:
+    description:
+     - ID of the domain of the fingerprint lists, defaults to the domain of
+       the logged-on user.
+    required: false
+    type: str
+  hashes:
+    description:
+     - The hashes to check, compared case insensitively.
+    required: true
+    type: list
+    elements: str
+  cache:
+    description:
+     - Path of a local file caching the fingerprint lists between runs.
+     - The file is only readable by its owner. It is not used by connections
+       to another manager host or as another user, nor when it cannot be
+       read, the lists are then fetched again.
+    required: false
+    type: path
+  max_age:
+    description:
+     - Seconds a cached fingerprint list is used before it is fetched again.
+    required: false
+    type: int
+    default: 300
+notes:
+  - The cache is not updated when hashes are added to the lists by other
+    means, lower I(max_age) if the lists change often.
+
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>
+"""
+
+
+RETURN = """
+present:
+    description: The hashes found, with the names of the lists containing them
+    returned: always
+    type: dict
+absent:
+    description: The hashes in none of the lists
+    returned: always
+    type: list
+    elements: str
+fetched_lists:
+    description: The lists fetched from the manager instead of the cache
+    returned: always
+    type: list
+    elements: str
+missing_lists:
+    description: The lists that do not exist on the manager
+    returned: always
+    type: list
+    elements: str
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
+"""
+
+EXAMPLES = """
+- name: find the indicators not blacklisted yet
+  symantec.epm.fingerprint_lists_filter:
+    lists:
+      - ioc-blacklist
+    hashes: "{{ ioc_md5_hashes }}"
+    cache: ~/.cache/symantec_epm/fingerprints.json
+  register: fingerprint_lists_filter_out
+
+- name: display the new indicators
+  debug:
+    var: fingerprint_lists_filter_out['absent']
+"""
+
+import traceback
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils._text import to_native
+from ansible.module_utils.connection import ConnectionError
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.requests_sep import (
+    SepRequestError,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.fingerprint_index import (
+    FingerprintIndex,
+)
+
+
+@profiled("fingerprint_lists_filter")
+def main():
+
+    argspec = dict(
+        lists=dict(required=True, type="list", elements="str"),
+        domain=dict(required=False, type="str"),
+        hashes=dict(required=True, type="list", elements="str"),
+        cache=dict(required=False, type="path"),
+        max_age=dict(required=False, type="int", default=300),
+    )
+
+    module = AnsibleModule(argument_spec=argspec, supports_check_mode=True)
+
+    sclient = Sepclient(module)
+
+    index = FingerprintIndex(module.params["cache"], module.params["max_age"])
+    try:
+        index.load(sclient, module.params["lists"], domain_id=module.params["domain"])
+    except (SepRequestError, ConnectionError) as e:
+        module.fail_json(
+            msg="Unable to fetch fingerprint lists: {0}".format(to_native(e)),
+            flow_control=sclient.flow_control_state(),
+        )
+    except (IOError, OSError) as e:
+        module.fail_json(
+            msg="Unable to cache fingerprint lists in {0}: {1}".format(
+                module.params["cache"], to_native(e)
+            ),
+            flow_control=sclient.flow_control_state(),
+        )
+    except Exception as e:
+        module.fail_json(
+            msg="Unable to load fingerprint lists: {0}".format(to_native(e)),
+            exception=traceback.format_exc(),
+            flow_control=sclient.flow_control_state(),
+        )
+
+    present, absent = index.partition(module.params["hashes"])
+
+    module.exit_json(
+        present=present,
+        absent=absent,
+        fetched_lists=index.fetched,
+        missing_lists=index.missing,
+        changed=False,
+        flow_control=sclient.flow_control_state(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -26,17 +26,47 @@ options:
      - The domain from which to get group information.
     required: false
     type: str
+  fullpathname:
+    description:
+     - The full path name of a group, e.g. C(My Company\\Servers\\Linux), to
+       get information about instead of all groups.
+     - The path is resolved locally against the group hierarchy of the
+       domain, the lookup is not case sensitive.
+    required: false
+    type: str
+  include_subgroups:
+    description:
+     - Also return all groups below the group given by C(fullpathname).
+    required: false
+    type: bool
+    default: false
+  plan:
+    description:
+     - Only probe the first record to return an estimate of the number of
+       requests, the size of the data and the time needed to get it, instead
+       of the data.
+    required: false
+    type: bool
+    default: false
 
 version_added: "2.9"
 notes:
   - This module returns a dict of group data and is meant to be registered to a
     variable in a Play for conditional use or inspection/debug purposes.
 
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+  - symantec.epm.plan
 author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>
 """
 
 
 RETURN = """
+plan:
+    description: Estimated cost of getting the data, instead of the data. See the
+                 symantec.epm.plan documentation fragment
+    returned: when C(plan) is set
+    type: dict
 id_list:
     type: str
     returned: always
@@ -48,6 +78,11 @@ groups:
     description: Each list entry contains a dictionary that represents
                  a group to Symantec Endpoint Security
                  https://apidocs.symantec.com/home/saep#_group
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
 """
 
 EXAMPLES = """
@@ -68,6 +103,16 @@ EXAMPLES = """
 - debug:
     var: groups_in_domain_info_out
 
+- name: get information about a group and all groups below it
+  symantec.epm.groups_info:
+    fullpathname: 'My Company\\Servers'
+    include_subgroups: true
+  register: servers_groups_info_out
+
+- name: scan all endpoints in the group hierarchy found above
+  symantec.epm.scan_endpoints:
+    groups: "{{ servers_groups_info_out['id_list'] }}"
+
 """
 
 
@@ -77,32 +122,60 @@ from ansible.module_utils._text import to_text
 from ansible.module_utils.urls import Request
 from ansible.module_utils.six.moves.urllib.parse import quote
 from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
 from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.planner import plan_paged
 
 import copy
 import json
 
 
+@profiled("groups_info")
 def main():
 
-    argspec = dict(domain=dict(required=False, type="str"),)
+    argspec = dict(
+        domain=dict(required=False, type="str"),
+        fullpathname=dict(required=False, type="str"),
+        include_subgroups=dict(required=False, type="bool", default=False),
+        plan=dict(required=False, type="bool", default=False),
+    )
 
     module = AnsibleModule(argument_spec=argspec, supports_check_mode=True)
 
     sclient = Sepclient(module)
 
-    client_response = sclient.get_groups(domain=module.params["domain"],)
-
-    if "content" in client_response:
-        list_of_groups = client_response["content"]
-        id_list = ""
-        try:
-            id_list += ",".join([group["id"] for group in list_of_groups])
-        except KeyError:
-            module.warn("Unable to compile id_list")
-        module.exit_json(groups=list_of_groups, id_list=id_list, changed=False)
+    if module.params["plan"]:
+        plan = plan_paged(
+            sclient.get_groups, domain=module.params["domain"], mode="list"
+        )
+        if plan is None:
+            module.fail_json(
+                msg="Unable to query groups data",
+                flow_control=sclient.flow_control_state(),
+            )
+        module.exit_json(
+            plan=plan, changed=False, flow_control=sclient.flow_control_state()
+        )
+
+    group_index = sclient.get_group_index(domain=module.params["domain"])
+    if module.params["fullpathname"]:
+        group_id = group_index.id_for_path(module.params["fullpathname"])
+        if group_id is None:
+            list_of_groups = []
+        elif module.params["include_subgroups"]:
+            list_of_groups = group_index.groups(group_index.subtree(group_id))
+        else:
+            list_of_groups = [group_index.get(group_id)]
     else:
-        module.fail_json(msg="Unable to query groups data")
+        list_of_groups = group_index.groups()
+
+    id_list = ",".join(group["id"] for group in list_of_groups)
+    module.exit_json(
+        groups=list_of_groups,
+        id_list=id_list,
+        changed=False,
+        flow_control=sclient.flow_control_state(),
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+DOCUMENTATION = """
+---
+module: move_endpoints
+short_description: Move endpoints to groups in Symantec Endpoint Protection Manager
+description:
+  - Move many endpoints to groups in Symantec Endpoint Protection Manager.
+  - Moves are packed into chunked requests which are sent one after the
+    other, endpoints that already are in their target group are skipped.
+version_added: "2.9"
+options:
+  endpoints:
+    description:
+     - The endpoints to move and the group to move each of them to.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      hardware_key:
+        description:
+         - The hardware key of the computer.
+        required: true
+        type: str
+      group:
+        description:
+         - The ID or the full path name of the target group,
+           e.g. C(My Company\\Servers\\Linux).
+        required: true
+        type: str
+  domain:
+    description:
+     - The domain of the computers and groups.
+    required: false
+    type: str
+  batch_size:
+    description:
+     - Maximum number of endpoints moved by a single request.
+    required: false
+    type: int
+    default: 100
+notes:
+  - If an endpoint is listed more than once, the last entry wins.
+  - The requests are not sent in parallel, the persistent connection
+    process serves the requests of a task one at a time. Raise
+    I(batch_size) to send fewer requests.
+  - An endpoint is only reported in C(moved) when the response has an
+    entry for it, endpoints missing from the response are reported in
+    C(failed_endpoints).
+  - The module fails if any endpoint could not be moved, all other endpoints
+    are still moved and reported in C(moved).
+
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+  - symantec.epm.plan
+author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>
+"""
+
+
+RETURN = """
+plan:
+    description: Estimated cost of the run, nothing is changed. See the
+                 symantec.epm.plan documentation fragment
+    returned: in check mode
+    type: dict
+moved:
+    description: Endpoints moved to their target group
+    returned: always
+    type: list
+    elements: dict
+    contains:
+        hardware_key:
+            description: The hardware key of the computer
+            type: str
+        group:
+            description: The ID of the group the computer was moved to
+            type: str
+skipped:
+    description: Hardware keys of the endpoints already in their target group
+    returned: always
+    type: list
+    elements: str
+failed_endpoints:
+    description: Endpoints that could not be moved
+    returned: always
+    type: list
+    elements: dict
+    contains:
+        hardware_key:
+            description: The hardware key of the computer
+            type: str
+        group:
+            description: The requested target group
+            type: str
+        msg:
+            description: Reason of the failure
+            type: str
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
+"""
+
+EXAMPLES = """
+- name: re-home Linux servers after an OU restructure
+  symantec.epm.move_endpoints:
+    endpoints:
+      - hardware_key: "7F2E52C1D3A0A5F3B7C52E7B3F1A9D21"
+        group: 'My Company\\Servers\\Linux'
+      - hardware_key: "0B4A1E7C5D3F2A9B8C7D6E5F4A3B2C1D"
+        group: "A1D2E3F4AC10037351F18F7B0E549D59"
+  register: move_endpoints_out
+
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    call_each,
+    chunked,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.planner import plan_requests
+
+
+def move_results(chunk, response, error):
+    """Match the response of a PATCH request to the endpoints of its chunk.
+
+    :param chunk: List of (groupid, hardwarekey) tuples sent in the request.
+    :param response: Result of Sepclient.move_endpoints.
+    :param error: Exception raised by the request, if any.
+    :return: List of error messages, None for every endpoint moved.
+    """
+    if error is not None:
+        return [str(error)] * len(chunk)
+    if isinstance(response, dict) and "errorCode" in response:
+        return [response.get("errorMessage", response["errorCode"])] * len(chunk)
+    if not isinstance(response, list):
+        return ["Unexpected response: {0}".format(response)] * len(chunk)
+
+    def item_message(item):
+        if not isinstance(item, dict):
+            return "Unexpected response"
+        if str(item.get("responseCode", "200")) == "200":
+            return None
+        return item.get("responseMessage", "Unknown error")
+
+    keys = [item.get("hardwareKey") for item in response if isinstance(item, dict)]
+    if len(keys) == len(response) and all(keys):
+        # Items name their endpoint, match them by hardware key
+        by_key = dict((item["hardwareKey"], item_message(item)) for item in response)
+        return [
+            by_key.get(hardwarekey, "No response for this endpoint")
+            for dummy, hardwarekey in chunk
+        ]
+    if len(response) != len(chunk):
+        # Items in order cannot be matched when some are missing
+        return ["No matching response for this endpoint"] * len(chunk)
+    return [item_message(item) for item in response]
+
+
+@profiled("move_endpoints")
+def main():
+
+    argspec = dict(
+        endpoints=dict(
+            required=True,
+            type="list",
+            elements="dict",
+            options=dict(
+                hardware_key=dict(required=True, type="str"),
+                group=dict(required=True, type="str"),
+            ),
+        ),
+        domain=dict(required=False, type="str"),
+        batch_size=dict(required=False, type="int", default=100),
+    )
+
+    module = AnsibleModule(argument_spec=argspec, supports_check_mode=True)
+
+    # The current groups of the computers decide which ones are moved
+    sclient = Sepclient(module, shared_reads=False)
+
+    requested = {}
+    for endpoint in module.params["endpoints"]:
+        requested[endpoint["hardware_key"]] = endpoint["group"]
+
+    group_index = sclient.get_group_index(domain=module.params["domain"])
+
+    current_groups = dict(
+        (comp.get("hardwareKey"), (comp.get("group") or {}).get("id"))
+        for comp in sclient.iter_computers(domain=module.params["domain"])
+        if comp.get("hardwareKey") in requested
+    )
+
+    pending = []
+    skipped = []
+    failed_endpoints = []
+    for hardware_key, group in requested.items():
+        group_id = group_index.resolve(group)
+        if group_id is None:
+            failed_endpoints.append(
+                dict(hardware_key=hardware_key, group=group, msg="Unknown group")
+            )
+        elif hardware_key not in current_groups:
+            failed_endpoints.append(
+                dict(hardware_key=hardware_key, group=group, msg="Unknown computer")
+            )
+        elif current_groups[hardware_key] == group_id:
+            skipped.append(hardware_key)
+        else:
+            pending.append((group_id, hardware_key))
+
+    if module.check_mode:
+        module.exit_json(
+            moved=[
+                dict(hardware_key=hardware_key, group=group_id)
+                for group_id, hardware_key in pending
+            ],
+            skipped=skipped,
+            failed_endpoints=failed_endpoints,
+            plan=plan_requests(
+                sclient, len(chunked(pending, module.params["batch_size"]))
+            ),
+            changed=bool(pending),
+            flow_control=sclient.flow_control_state(),
+        )
+
+    # The errors of a chunk are reported per endpoint, the other chunks are still sent
+    moved = []
+    for chunk, response, error in call_each(
+        sclient, sclient.move_endpoints, chunked(pending, module.params["batch_size"])
+    ):
+        for (group_id, hardware_key), msg in zip(
+            chunk, move_results(chunk, response, error)
+        ):
+            if msg is None:
+                moved.append(dict(hardware_key=hardware_key, group=group_id))
+            else:
+                failed_endpoints.append(
+                    dict(hardware_key=hardware_key, group=requested[hardware_key], msg=msg)
+                )
+
+    if failed_endpoints:
+        module.fail_json(
+            msg="Failed to move {0} endpoint(s)".format(len(failed_endpoints)),
+            moved=moved,
+            skipped=skipped,
+            failed_endpoints=failed_endpoints,
+            changed=bool(moved),
+            flow_control=sclient.flow_control_state(),
+        )
+
+    module.exit_json(
+        moved=moved,
+        skipped=skipped,
+        failed_endpoints=failed_endpoints,
+        changed=bool(moved),
+        flow_control=sclient.flow_control_state(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -38,21 +38,51 @@ options:
     type: bool
     required: false
     default: true
+  check_state:
+    description:
+     - Look up the current quarantine state of the endpoints first and only
+       schedule quarantine commands for the endpoints that need to change.
+     - The endpoints of C(groups) are expanded to their computers, commands are
+       then scheduled per computer instead of per group.
+     - Only the computers directly in C(groups) are checked, the computers of
+       their subgroups are not. List the subgroups too to include them.
+     - The commands are scheduled one after the other and the first one
+       that fails stops the task, the commands scheduled before it are
+       returned in C(command_ids) and C(changed_computers).
+    type: bool
+    required: false
+    default: false
+  domain:
+    description:
+     - The domain of the computers looked up when C(check_state) is set,
+       defaults to the logged-on domain.
+    type: str
+    required: false
 notes:
   - Must provide one of C(computers) or C(groups), or both parameters as input to this module.
   - Because of the means of interaction with Symantec Endpoint Protection, this
-    module is not idempotent. Every time this module is called via a task in a
-    module a quarantine action will be scheduled on the Endpoint Protection Manager.
+    module is not idempotent unless C(check_state) is set. Every time this module
+    is called via a task in a module a quarantine action will be scheduled on the
+    Endpoint Protection Manager.
 
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+  - symantec.epm.plan
 author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>"
 """
 
 
 # FIXME - provide correct example here
 RETURN = """
+plan:
+    description: Estimated cost of the run, nothing is changed. See the
+                 symantec.epm.plan documentation fragment
+    returned: in check mode
+    type: dict
 sepm_data:
     description: Data returned from Symantec Endpoint Protection Manager
-    returned: always
+    returned: when C(check_state) is not set, and when a command of
+              C(check_state) fails
     type: complex
     contains:
         commandID_computer:
@@ -69,6 +99,28 @@ command_ids:
     description: List of all commandIDs spawned from this job
     returned: always
     type: list
+changed_computers:
+    description: IDs of the computers a quarantine command was scheduled
+                 for. When a command fails, only those scheduled before it
+    returned: when C(check_state) is set
+    type: list
+    elements: str
+unchanged_computers:
+    description: IDs of the computers already in the requested state
+    returned: when C(check_state) is set
+    type: list
+    elements: str
+not_found:
+    description: IDs in C(computers) of the computers not found on the
+                 manager, no command is scheduled for them
+    returned: when C(check_state) is set
+    type: list
+    elements: str
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
 """
 
 EXAMPLES = """
@@ -83,29 +135,135 @@ EXAMPLES = """
   symantec.epm.quarantine_endpoints:
     computers: "{{ computerss_info_out['id_list'] }}"
 
+- name: quarantine the same computers, skipping those already quarantined
+  symantec.epm.quarantine_endpoints:
+    computers: "{{ computerss_info_out['id_list'] }}"
+    check_state: true
+
 """
 
 from ansible.module_utils.basic import AnsibleModule
 
 from ansible.module_utils.six.moves.urllib.parse import urlencode
-from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import (
+    Sepclient,
+    is_quarantined,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    call_each,
+    chunked,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.command_journal import (
+    split_ids,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.planner import plan_requests
 
+# Computer IDs sent per command, they are passed in the query string
+COMPUTER_IDS_PER_COMMAND = 200
 
+
+def quarantine_changed_endpoints(module, sclient, undo):
+    """Schedule quarantine commands only for the computers not yet in the
+    requested state.
+    """
+    computer_ids = set(
+        cid.strip() for cid in (module.params["computers"] or "").split(",") if cid.strip()
+    )
+    group_ids = set(
+        gid.strip() for gid in (module.params["groups"] or "").split(",") if gid.strip()
+    )
+
+    changed_computers = []
+    unchanged_computers = []
+    found = set()
+    for comp in sclient.iter_computers(domain=module.params["domain"]):
+        if (
+            comp.get("uniqueId") not in computer_ids
+            and (comp.get("group") or {}).get("id") not in group_ids
+        ):
+            continue
+        found.add(comp["uniqueId"])
+        if is_quarantined(comp) is module.params["quarantine"]:
+            unchanged_computers.append(comp["uniqueId"])
+        else:
+            changed_computers.append(comp["uniqueId"])
+    not_found = sorted(computer_ids - found)
+
+    if module.check_mode:
+        module.exit_json(
+            command_ids=[],
+            changed_computers=changed_computers,
+            unchanged_computers=unchanged_computers,
+            not_found=not_found,
+            plan=plan_requests(
+                sclient,
+                len(chunked(changed_computers, COMPUTER_IDS_PER_COMMAND)),
+                command_queue_entries=len(changed_computers),
+            ),
+            changed=bool(changed_computers),
+            flow_control=sclient.flow_control_state(),
+        )
+
+    # The chunks are sent one after the other, a failed chunk stops the task
+    # before the commands of the next ones are queued
+    command_ids = []
+    scheduled = []
+    for chunk, sepm_data, error in call_each(
+        sclient,
+        lambda ids: sclient.quarantine_endpoints(computer_ids=",".join(ids), undo=undo),
+        chunked(changed_computers, COMPUTER_IDS_PER_COMMAND),
+    ):
+        if error is not None:
+            msg = "Failed to quarantine: {0}".format(error)
+        elif not isinstance(sepm_data, dict) or "errorCode" in sepm_data:
+            msg = "Failed to quarantine."
+        else:
+            msg = None
+        if msg is not None:
+            module.fail_json(
+                msg=msg,
+                sepm_data=sepm_data or {},
+                command_ids=command_ids,
+                changed_computers=scheduled,
+                unchanged_computers=unchanged_computers,
+                not_found=not_found,
+                changed=bool(scheduled),
+                flow_control=sclient.flow_control_state(),
+            )
+        if 'commandID_computer' in sepm_data:
+            command_ids.append(sepm_data['commandID_computer'])
+        scheduled.extend(chunk)
+
+    module.exit_json(
+        command_ids=command_ids,
+        changed_computers=changed_computers,
+        unchanged_computers=unchanged_computers,
+        not_found=not_found,
+        changed=bool(changed_computers),
+        flow_control=sclient.flow_control_state(),
+    )
+
+
+@profiled("quarantine_endpoints")
 def main():
 
     argspec = dict(
         computers=dict(required=False, type="str"),
         groups=dict(required=False, type="str"),
         quarantine=dict(required=False, type="bool", default=True),
+        check_state=dict(required=False, type="bool", default=False),
+        domain=dict(required=False, type="str"),
     )
 
     module = AnsibleModule(
         argument_spec=argspec,
         required_one_of=[["computers", "groups"]],
-        supports_check_mode=False,
+        supports_check_mode=True,
     )
 
-    sclient = Sepclient(module)
+    # With check_state, the current state decides which computers get a command
+    sclient = Sepclient(module, shared_reads=not module.params["check_state"])
 
     # Need a little book keeping for the IBM SEP Client API expectations
     if module.params["quarantine"] is False:
@@ -113,6 +271,23 @@ def main():
     else:
         undo = None
 
+    if module.params["check_state"]:
+        quarantine_changed_endpoints(module, sclient, undo)
+
+    if module.check_mode:
+        module.exit_json(
+            sepm_data={},
+            command_ids=[],
+            plan=plan_requests(
+                sclient,
+                1,
+                command_queue_entries=len(split_ids(module.params["computers"]))
+                + len(split_ids(module.params["groups"])),
+            ),
+            changed=True,
+            flow_control=sclient.flow_control_state(),
+        )
+
     sepm_data = sclient.quarantine_endpoints(
         computer_ids=module.params["computers"],
         group_ids=module.params["groups"],
@@ -120,7 +295,11 @@ def main():
     )
 
     if "errorCode" in sepm_data:
-        module.fail_json(msg="Failed to qaurantine.", sepm_data=sepm_data)
+        module.fail_json(
+            msg="Failed to qaurantine.",
+            sepm_data=sepm_data,
+            flow_control=sclient.flow_control_state(),
+        )
 
     command_ids = []
     if 'commandID_computer' in sepm_data:
@@ -128,7 +307,12 @@ def main():
     if 'commandID_group' in sepm_data:
         command_ids.append(sepm_data['commandID_group'])
 
-    module.exit_json(sepm_data=sepm_data, command_ids=command_ids, changed=True)
+    module.exit_json(
+        sepm_data=sepm_data,
+        command_ids=command_ids,
+        changed=True,
+        flow_control=sclient.flow_control_state(),
+    )
 
 
 if __name__ == "__main__":
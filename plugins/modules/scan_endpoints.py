@@ -41,17 +41,44 @@ options:
      - FULL_SCAN
      - QUICK_SCAN
     default: QUICK_SCAN
+  journal:
+    description:
+     - Path of a local journal of the commands submitted by this collection.
+     - When set, the journal is checked before a new command is scheduled. If
+       an identical command for the same targets was recorded less than
+       C(journal_max_age) seconds ago and its command status shows it is still
+       running, that command is reused instead of scheduling a duplicate.
+     - The journal stays locked from the check until the new command is
+       recorded, tasks using the same journal run this step one at a time.
+     - Use a separate journal per Endpoint Protection Manager.
+    required: false
+    type: path
+  journal_max_age:
+    description:
+     - Seconds after which a journal entry is no longer reused.
+    required: false
+    type: int
+    default: 3600
 notes:
   - Because of the means of interaction with Symantec Endpoint Protection, this
     module is not idempotent. Every time this module is called via a task in a
-    module a scan will be scheduled on the Endpoint Protection Manager.
+    module a scan will be scheduled on the Endpoint Protection Manager, unless
+    an identical command is still in flight according to C(journal).
 
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+  - symantec.epm.plan
 author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>"
 """
 
 
 # FIXME - provide correct example here
 RETURN = """
+plan:
+    description: Estimated cost of the run, nothing is changed. See the
+                 symantec.epm.plan documentation fragment
+    returned: in check mode
+    type: dict
 sepm_data:
     description: Data returned from Symantec Endpoint Protection Manager
     returned: always
@@ -66,6 +93,16 @@ command_ids:
     description: List of all commandIDs spawned from this job
     returned: always
     type: list
+reused:
+    description: Whether an in-flight command from C(journal) was reused
+                 instead of scheduling a new one
+    returned: always
+    type: bool
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
 """
 
 EXAMPLES = """
@@ -86,9 +123,17 @@ import datetime
 from ansible.module_utils.basic import AnsibleModule
 
 from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
 from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.command_journal import (
+    CommandJournal,
+    find_in_flight,
+    split_ids,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.planner import plan_requests
 
 
+@profiled("scan_endpoints")
 def main():
 
     argspec = dict(
@@ -100,16 +145,54 @@ def main():
             choices=["FULL_SCAN", "QUICK_SCAN"],
             default="QUICK_SCAN",
         ),
+        journal=dict(required=False, type="path"),
+        journal_max_age=dict(required=False, type="int", default=3600),
     )
 
     module = AnsibleModule(
         argument_spec=argspec,
         required_one_of=[["computers", "groups"]],
-        supports_check_mode=False,
+        supports_check_mode=True,
     )
 
     sclient = Sepclient(module)
 
+    if module.params["journal"]:
+        journal = CommandJournal(module.params["journal"], module.params["journal_max_age"])
+        # Held until the new command is recorded, so that a task running at
+        # the same time finds it instead of submitting it again
+        journal.acquire()
+        journal_key = CommandJournal.make_key(
+            "scan",
+            computer_ids=module.params["computers"],
+            group_ids=module.params["groups"],
+            payload={"scan_type": module.params["type"]},
+        )
+        entry = find_in_flight(journal, sclient, journal_key)
+        if entry is not None:
+            module.exit_json(
+                sepm_data=entry["sepm_data"],
+                command_ids=entry["command_ids"],
+                reused=True,
+                changed=False,
+                flow_control=sclient.flow_control_state(),
+            )
+
+    if module.check_mode:
+        module.exit_json(
+            sepm_data={},
+            command_ids=[],
+            reused=False,
+            plan=plan_requests(
+                sclient,
+                1,
+                command_queue_entries=len(split_ids(module.params["computers"]))
+                + len(split_ids(module.params["groups"])),
+            ),
+            changed=True,
+            flow_control=sclient.flow_control_state(),
+        )
+
     sepm_data = sclient.scan_endpoints(
         computer_ids=module.params["computers"],
         group_ids=module.params["groups"],
@@ -120,7 +203,11 @@ def main():
     )
 
     if "errorCode" in sepm_data:
-        module.fail_json(msg="Failed to schedule Scan", sepm_data=sepm_data)
+        module.fail_json(
+            msg="Failed to schedule Scan",
+            sepm_data=sepm_data,
+            flow_control=sclient.flow_control_state(),
+        )
 
     command_ids = []
     if 'commandID_computer' in sepm_data:
@@ -128,7 +215,25 @@ def main():
     if 'commandID_group' in sepm_data:
         command_ids.append(sepm_data['commandID_group'])
 
-    module.exit_json(sepm_data=sepm_data, command_ids=command_ids, changed=True)
+    if module.params["journal"]:
+        journal.record(
+            journal_key,
+            "scan",
+            module.params["computers"],
+            module.params["groups"],
+            {"scan_type": module.params["type"]},
+            command_ids,
+            sepm_data,
+        )
+        journal.release()
+
+    module.exit_json(
+        sepm_data=sepm_data,
+        command_ids=command_ids,
+        reused=False,
+        changed=True,
+        flow_control=sclient.flow_control_state(),
+    )
 
 
 if __name__ == "__main__":
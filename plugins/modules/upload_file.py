@@ -0,0 +1,267 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+DOCUMENTATION = """
+---
+module: upload_file
+short_description: Upload suspicious files from endpoints to Symantec Endpoint Protection Manager
+description:
+  - Schedule the upload of suspicious files from endpoints to the Symantec
+    Endpoint Protection Manager, for every combination of the given files
+    and computers.
+  - The command queue takes one file per command and any number of
+    computers, so one command is scheduled per file and batch of computers,
+    several of them at the same time.
+version_added: "2.9"
+options:
+  files:
+    description:
+     - The files to upload.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      file_path:
+        description:
+         - The path of the file on the endpoints.
+        required: true
+        type: str
+      sha256:
+        description:
+         - The SHA256 hash of the file.
+        required: true
+        type: str
+      md5:
+        description:
+         - The MD5 hash of the file.
+        required: false
+        type: str
+      sha1:
+        description:
+         - The SHA1 hash of the file.
+        required: false
+        type: str
+  computers:
+    description:
+     - Comma delimited list of the computers to upload the files from.
+    required: true
+    type: str
+  source:
+    description:
+     - Where to look for the files on the endpoints, the manager defaults to
+       C(FILESYSTEM).
+    required: false
+    type: str
+    choices:
+     - FILESYSTEM
+     - QUARANTINE
+     - BOTH
+  batch_size:
+    description:
+     - Maximum number of computers per command, they are passed in the query
+       string.
+    required: false
+    type: int
+    default: 200
+notes:
+  - This module is not idempotent, every run schedules new upload commands.
+
+extends_documentation_fragment:
+  - symantec.epm.flow_control
+  - symantec.epm.plan
+author: Ansible Security Automation Team (@maxamillion) <https://github.com/ansible-security>
+"""
+
+
+RETURN = """
+plan:
+    description: Estimated cost of the run, nothing is changed. See the
+                 symantec.epm.plan documentation fragment
+    returned: in check mode
+    type: dict
+command_ids:
+    description: List of all commandIDs spawned from this job
+    returned: always
+    type: list
+    elements: str
+command_map:
+    description: The file and the computers of every command scheduled, by
+                 command ID, e.g. to poll their status with command_status
+    returned: always
+    type: dict
+    sample:
+        "9F2A0E7AC0A8010B1D8E94EC5B2E1D3A":
+            sha256: "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+            file_path: "C:\\\\Temp\\\\dropper.exe"
+            computers:
+                - "1B2E3A4F0A8C0D2B0F6E5D4C3B2A1908"
+failed_commands:
+    description: The file and the computers of every command that could not
+                 be scheduled, with the error message
+    returned: always
+    type: list
+    elements: dict
+flow_control:
+    description: State of the flow control of the API calls of the task,
+                 see the symantec.epm.flow_control documentation fragment
+    returned: always
+    type: dict
+"""
+
+EXAMPLES = """
+- name: upload a file from all Win7 computers
+  symantec.epm.upload_file:
+    files:
+      - file_path: 'C:\\Temp\\dropper.exe'
+        sha256: e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855
+    computers: "{{ computers_info_out['id_list'] }}"
+  register: upload_file_out
+
+- name: check the status of the upload commands
+  symantec.epm.command_status:
+    id: "{{ item }}"
+  loop: "{{ upload_file_out['command_ids'] }}"
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.symantec.epm.plugins.module_utils.profiling import profiled
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import Sepclient
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    call_each,
+    chunked,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.planner import plan_requests
+
+
+def upload_commands(files, computer_ids, batch_size):
+    """Plan the commands uploading every file from every computer.
+
+    :param files: List of file dicts as given to the module.
+    :param computer_ids: List of computer IDs.
+    :param batch_size: Maximum number of computers per command.
+    :return: List of (file, computer IDs) tuples, one per command.
+    """
+    return [
+        (upload, chunk)
+        for upload in files
+        for chunk in chunked(computer_ids, batch_size)
+    ]
+
+
+@profiled("upload_file")
+def main():
+
+    argspec = dict(
+        files=dict(
+            required=True,
+            type="list",
+            elements="dict",
+            options=dict(
+                file_path=dict(required=True, type="str"),
+                sha256=dict(required=True, type="str"),
+                md5=dict(required=False, type="str"),
+                sha1=dict(required=False, type="str"),
+            ),
+        ),
+        computers=dict(required=True, type="str"),
+        source=dict(
+            required=False, type="str", choices=["FILESYSTEM", "QUARANTINE", "BOTH"]
+        ),
+        batch_size=dict(required=False, type="int", default=200),
+    )
+
+    module = AnsibleModule(argument_spec=argspec, supports_check_mode=True)
+
+    sclient = Sepclient(module)
+
+    computer_ids = []
+    for cid in module.params["computers"].split(","):
+        if cid.strip() and cid.strip() not in computer_ids:
+            computer_ids.append(cid.strip())
+
+    commands = upload_commands(
+        module.params["files"], computer_ids, module.params["batch_size"]
+    )
+
+    if module.check_mode:
+        module.exit_json(
+            command_ids=[],
+            command_map={},
+            failed_commands=[],
+            plan=plan_requests(
+                sclient,
+                len(commands),
+                command_queue_entries=len(module.params["files"]) * len(computer_ids),
+            ),
+            changed=bool(commands),
+            flow_control=sclient.flow_control_state(),
+        )
+
+    # The errors of a command are reported, the other commands are still scheduled
+    command_ids = []
+    command_map = {}
+    failed_commands = []
+    for (upload, chunk), sepm_data, error in call_each(
+        sclient,
+        lambda command: sclient.upload_file(
+            file_path=command[0]["file_path"],
+            computer_ids=",".join(command[1]),
+            sha256=command[0]["sha256"],
+            md5=command[0]["md5"],
+            sha1=command[0]["sha1"],
+            source=module.params["source"],
+        ),
+        commands,
+    ):
+        command = dict(
+            sha256=upload["sha256"], file_path=upload["file_path"], computers=chunk
+        )
+        if error is not None:
+            command["msg"] = str(error)
+        elif not isinstance(sepm_data, dict) or "errorCode" in sepm_data:
+            command["msg"] = "Failed to upload file."
+            command["sepm_data"] = sepm_data
+        elif "commandID_computer" in sepm_data or "commandID" in sepm_data:
+            command_id = sepm_data.get("commandID_computer", sepm_data.get("commandID"))
+            command_ids.append(command_id)
+            command_map[command_id] = command
+            continue
+        else:
+            command["msg"] = "No command ID returned."
+            command["sepm_data"] = sepm_data
+        failed_commands.append(command)
+
+    if failed_commands:
+        module.fail_json(
+            msg="Failed to schedule {0} upload command(s)".format(len(failed_commands)),
+            command_ids=command_ids,
+            command_map=command_map,
+            failed_commands=failed_commands,
+            changed=bool(command_ids),
+            flow_control=sclient.flow_control_state(),
+        )
+
+    module.exit_json(
+        command_ids=command_ids,
+        command_map=command_map,
+        failed_commands=failed_commands,
+        changed=bool(command_ids),
+        flow_control=sclient.flow_control_state(),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmark of HttpApi._response_to_json on a large /computers page.
+
+Compares decoding the response buffer the way the plugin did before, by
+copying it to bytes and then to text, with the current path, with and
+without orjson. Run it with the collection on the Python path, e.g.
+
+    PYTHONPATH=~/.ansible/collections python tests/performance/bench_response_to_json.py
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+from ansible.module_utils._text import to_text
+
+import ansible_collections.symantec.epm.plugins.httpapi.epm as epm
+
+RECORDS = 1000
+RUNS = 20
+
+
+def computer(i):
+    return {
+        "uniqueId": "U%05d" % i,
+        "hardwareKey": "HK%05d" % i,
+        "computerName": "host%05d" % i,
+        "group": {"id": "G1", "name": "G1"},
+        "onlineStatus": i % 2,
+        "operatingSystem": "Windows 10",
+        "macAddresses": ["00-11-22-33-%02X-%02X" % (i // 256 % 256, i % 256)],
+        "ipAddresses": ["10.0.%d.%d" % (i // 256 % 256, i % 256)],
+        "domainOrWorkgroup": "CORP",
+        "agentVersion": "14.3.558",
+        "description": "x" * 40,
+        "lastScanTime": 1600000000000 + i,
+        "osversion": "10.0",
+        "osbitness": "x64",
+        "patternIdx": "ABCDEF0123456789",
+        "profileVersion": "14.3.558",
+    }
+
+
+def response_buffer(page):
+    # The httpapi connection reads the response into a BytesIO
+    buf = io.BytesIO()
+    buf.write(page)
+    return buf
+
+
+def measure(label, decode, page):
+    times = []
+    for dummy in range(RUNS):
+        buf = response_buffer(page)
+        start = time.perf_counter()
+        decode(buf)
+        times.append(time.perf_counter() - start)
+    buf = response_buffer(page)
+    tracemalloc.start()
+    result = decode(buf)
+    dummy, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        "%-32s median %6.2f ms  peak %5.2f MiB"
+        % (label, sorted(times)[RUNS // 2] * 1000, peak / 2.0 ** 20)
+    )
+    return result
+
+
+def main():
+    page = json.dumps(
+        {"content": [computer(i) for i in range(RECORDS)], "totalElements": 100000}
+    ).encode("utf-8")
+    print("page of %d records, %.0f KiB" % (RECORDS, len(page) / 1024.0))
+
+    api = epm.HttpApi.__new__(epm.HttpApi)
+    expected = measure(
+        "getvalue + to_text + json.loads",
+        lambda buf: json.loads(to_text(buf.getvalue())),
+        page,
+    )
+
+    has_orjson = epm.HAS_ORJSON
+    try:
+        epm.HAS_ORJSON = False
+        results = [measure("_response_to_json, json", api._response_to_json, page)]
+        if has_orjson:
+            epm.HAS_ORJSON = True
+            results.append(
+                measure("_response_to_json, orjson", api._response_to_json, page)
+            )
+        else:
+            print("orjson is not installed")
+    finally:
+        epm.HAS_ORJSON = has_orjson
+
+    if any(result != expected for result in results):
+        print("decoded responses differ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
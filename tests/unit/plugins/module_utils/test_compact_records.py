@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.symantec.epm.plugins.module_utils.compact_records import (
+    CompactRecords,
+)
+
+
+def test_round_trip_keeps_value_types():
+    records = [
+        {"a": {"x": 1, "y": [0]}},
+        {"a": {"x": True, "y": [False]}},
+        {"a": {"x": 1.0, "y": [0.0]}},
+        {"a": {"x": 1, "y": [0]}, "b": [1, True, 1.0]},
+    ]
+    result = CompactRecords(records).to_dicts()
+    assert result == records
+    for record, expected in zip(result, records):
+        assert repr(record) == repr(expected)
+
+
+def test_equal_values_are_shared():
+    records = CompactRecords(
+        [
+            {"group": {"id": "G1", "name": "My Company"}, "ips": ["10.0.0.1"]},
+            {"group": {"id": "G1", "name": "My Company"}, "ips": ["10.0.0.1"]},
+            {"group": {"id": "G1", "level": 1}, "ips": [1]},
+            {"group": {"id": "G1", "level": 1}, "ips": [1]},
+        ]
+    )
+    column = records._columns["group"]
+    assert column[0] is column[1]
+    assert column[2] is column[3]
+    assert column[0] is not column[2]
+    assert records._columns["ips"][2] is records._columns["ips"][3]
+
+
+def test_missing_keys():
+    records = CompactRecords([{"a": 1}, {"b": None}])
+    assert records.to_dicts() == [{"a": 1}, {"b": None}]
+    assert list(records.column("a", "default")) == [1, "default"]
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+
+from ansible_collections.symantec.epm.plugins.module_utils import requests_sep
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    call_each,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.requests_sep import (
+    SepRequestError,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import (
+    Sepclient,
+)
+
+
+class FakeConnection(object):
+    """Fails the requests for command IDs starting with BAD."""
+
+    def __init__(self, socket_path):
+        self.sent = []
+
+    def send_request(self, method, url, headers=None, params=None, data=None):
+        self.sent.append(url)
+        if "/BAD" in url:
+            raise HTTPError(url, 500, "Internal Server Error", {}, None)
+        return 200, {"url": url}
+
+
+class ModuleFailed(Exception):
+    pass
+
+
+class FakeModule(object):
+    _socket_path = "/nonexistent/socket"
+
+    def fail_json(self, **kwargs):
+        raise ModuleFailed(kwargs["msg"])
+
+
+@pytest.fixture
+def sclient(monkeypatch):
+    monkeypatch.setattr(requests_sep, "Connection", FakeConnection)
+    return Sepclient(FakeModule())
+
+
+def test_call_each_reports_errors_per_item(sclient):
+    results = list(
+        call_each(
+            sclient,
+            lambda commandid: sclient.get_command_status(commandid=commandid),
+            ["C1", "BAD2", "C3"],
+        )
+    )
+
+    assert [item for item, dummy, dummy in results] == ["C1", "BAD2", "C3"]
+    assert results[0][1]["url"].endswith("/C1") and results[0][2] is None
+    assert results[1][1] is None and isinstance(results[1][2], SepRequestError)
+    assert results[2][1]["url"].endswith("/C3") and results[2][2] is None
+
+
+def test_calls_fail_the_module_outside_raising_errors(sclient):
+    with sclient.raising_errors():
+        with pytest.raises(SepRequestError):
+            sclient.get_command_status(commandid="BAD1")
+
+    with pytest.raises(ModuleFailed):
+        sclient.get_command_status(commandid="BAD1")
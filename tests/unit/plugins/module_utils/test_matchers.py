@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.symantec.epm.plugins.module_utils.matchers import (
+    RecordMatcher,
+    computer_matcher,
+    pattern_list,
+)
+
+
+def test_pattern_list_converts_scalars():
+    assert pattern_list("a*") == ["a*"]
+    assert pattern_list(1) == ["1"]
+    assert pattern_list(True) == ["True"]
+    assert pattern_list([1.5, "x"]) == ["1.5", "x"]
+
+
+@pytest.mark.parametrize("patterns", [None, {"a": 1}, [None], [["a"]]])
+def test_pattern_list_rejects_other_types(patterns):
+    with pytest.raises(TypeError):
+        pattern_list(patterns)
+
+
+def test_scalar_patterns_match_record_values():
+    records = [
+        {"infected": 1, "firewallOnStatus": True},
+        {"infected": 0, "firewallOnStatus": False},
+    ]
+    assert RecordMatcher({"infected": 1}).filter(records) == records[:1]
+    assert RecordMatcher({"firewallOnStatus": False}).filter(records) == records[1:]
+    assert RecordMatcher({"infected": [0, 1]}).filter(records) == records
+
+
+def test_computer_matcher_mac_and_status():
+    matcher = computer_matcher(mac="00:50:56:*", status="online")
+    assert matcher.match({"macAddresses": ["00-50-56-00-0A-01"], "onlineStatus": 1})
+    assert not matcher.match({"macAddresses": ["00-50-56-00-0A-01"], "onlineStatus": 0})
+    assert not computer_matcher()
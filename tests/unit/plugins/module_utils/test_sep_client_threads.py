@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# (c) 2020 Red Hat Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import random
+import threading
+import time
+
+from ansible_collections.symantec.epm.plugins.module_utils import requests_sep
+from ansible_collections.symantec.epm.plugins.module_utils.concurrency import (
+    run_concurrently,
+)
+from ansible_collections.symantec.epm.plugins.module_utils.sep_client import (
+    Sepclient,
+)
+
+
+class FakeConnection(object):
+    """Answers every request with the request itself, after yielding to the
+    other threads so that calls made at the same time interleave."""
+
+    instances = []
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.lock = threading.Lock()
+        self.requests = 0
+        FakeConnection.instances.append(self)
+
+    def send_request(self, method, url, headers=None, params=None, data=None):
+        # Keep what was received before yielding, a header dict shared
+        # between calls may be changed by another thread meanwhile
+        received = dict(
+            method=method, url=url, params=dict(params or {}), headers=dict(headers or {})
+        )
+        time.sleep(random.random() / 1000)
+        with self.lock:
+            self.requests += 1
+        received["headers_after"] = dict(headers or {})
+        return 200, received
+
+
+class FakeModule(object):
+    _socket_path = "/nonexistent/socket"
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs)
+
+
+def test_calls_do_not_share_headers(monkeypatch):
+    monkeypatch.setattr(requests_sep, "Connection", FakeConnection)
+    FakeConnection.instances = []
+    sclient = Sepclient(FakeModule())
+    calls = {
+        "file": lambda i: sclient.get_file_content(file_id="F%d" % i),
+        "version": lambda i: sclient.get_version(),
+        "status": lambda i: sclient.get_command_status(commandid="C%d" % i),
+        "computers": lambda i: sclient.get_computers(
+            computername="N%d" % i, pageindex=1, pagesize=10
+        ),
+    }
+    items = [(random.choice(sorted(calls)), i) for i in range(1000)]
+
+    results = run_concurrently(lambda item: calls[item[0]](item[1]), items, 32)
+
+    for (kind, i), response, error in results:
+        assert error is None
+        assert response["headers"] == response["headers_after"]
+        compressed = "Accept-Encoding" in response["headers"]
+        if kind == "file":
+            assert response["url"].endswith("/file/F%d/content" % i)
+            assert compressed
+        elif kind == "status":
+            assert response["url"].endswith("/C%d" % i)
+            assert not compressed
+        elif kind == "computers":
+            assert response["params"]["computerName"] == "N%d" % i
+            assert not compressed
+        else:
+            assert response["url"].endswith("/version")
+            assert not compressed
+
+    # The client headers are never changed by a call
+    assert sclient._headers == {"content-type": "application/json"}
+    # One connection is created and shared by all the threads
+    assert len(FakeConnection.instances) == 1
+    assert FakeConnection.instances[0].requests == len(items)
+    assert sclient.flow_control_state()["requests"]["calls"] == len(items)